@@ -10,13 +10,21 @@ to prevent duplicates naturally.
 
 import os
 import re
-import pytz
+import platform
+import asyncio
+import codecs
 import smtplib
+import functools
+import threading
+import uuid
+from collections import defaultdict
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright, Page
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Error as PlaywrightError
 
 # Load environment variables
 load_dotenv()
@@ -25,51 +33,606 @@ load_dotenv()
 if not os.getenv('PLAYWRIGHT_BROWSERS_PATH'):
     os.environ['PLAYWRIGHT_BROWSERS_PATH'] = '/opt/render/project/.playwright-browsers'
 
+# Schedule times are HH:MM (24-hour); bookings open on the quarter hour
+_TIME_RE = re.compile(r'^([01]?\d|2[0-3]):([0-5]\d)$')
+_VALID_MINUTES = frozenset({0, 15, 30, 45})
+_DAY_NAMES = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+_VALID_DAYS = frozenset(_DAY_NAMES)
+
+# Members with credentials configured in the environment
+_VALID_USERS = frozenset({'peter', 'adrienne', 'lucy'})
+
+# Swim bookings are scheduled with an instructor of "Swim(<minutes>)"
+_SWIM_RE = re.compile(r'swim\((\d+)\)')
+
+# Collapses runs of whitespace in text scraped from the page
+_WS_RE = re.compile(r'\s+')
+
+# UK time (handles BST automatically)
+_UK_TZ = ZoneInfo('Europe/London')
+
+# Fail fast on hung page actions rather than waiting out Playwright's 30s defaults,
+# and cap the whole login + booking flow for a single schedule entry
+_ACTION_TIMEOUT_MS = 10_000
+_NAVIGATION_TIMEOUT_MS = 15_000
+_BOOKING_TIMEOUT_SECONDS = 90
+
+# Connect/read timeout for failure emails, so a hung mail server can't hold up a run
+_SMTP_TIMEOUT_SECONDS = 15
+
+# Default cap on bookings (browser contexts) running at once; override with MAX_CONCURRENT_BOOKINGS
+_DEFAULT_MAX_CONCURRENT_BOOKINGS = 3
+
+# Class calendar, fetched in the background right after login so the server side is warm
+_CLASS_CALENDAR_URL = 'https://online.thehogarth.co.uk/CCE/ClassCalendar.aspx'
+
+# Present once a class calendar week has rendered: the week Next link or a class tile
+_CALENDAR_READY_SELECTOR = 'a#ctl00_mainContent_ibNext, div.classDesktopWrapper'
+
+# Selector lists for the booking flows, most preferred first
+_CLASS_CARD_SELECTORS = (
+    'div.classSelectFire',
+    'div.uk-panel-box',
+    'div.className'
+)
+_CLASS_TERMS_SELECTORS = (
+    'input#ctl00_mainContent_chkTerms',  # Updated to match actual HTML
+    'input#ctl00_mainContent_Terms',  # Keep old one as fallback
+    'input[type="checkbox"]'
+)
+_CLASS_CONFIRM_SELECTORS = (
+    'a#ctl00_mainContent_PageNavControl_ibNext',
+    'button:has-text("Book")',
+    'button:has-text("Confirm")',
+    'input[value="Book"]',
+    'input[value="Confirm"]'
+)
+# Shown after a class or swim booking goes through
+_BOOKING_SUCCESS_SELECTORS = (
+    'h1:has-text("Booking Complete")',
+    ':text("booked")',
+    ':text("confirmed")',
+    ':text("success")'
+)
+_SWIM_LINK_SELECTORS = (
+    'a[href="../swim/Swim.aspx"]',
+    'a[href*="Swim.aspx"]',
+    'a[href*="swim"]',
+    'a:has-text("Swim")',
+    'a:has-text("Swimming")',
+    'a:has-text("Pool")'
+)
+_DATEPICKER_CALENDAR_SELECTORS = (
+    '.uk-datepicker',
+    '[data-uk-datepicker]',
+    '.datepicker',
+    '.uk-dropdown'
+)
+_DURATION_SELECTORS = (
+    'select#ctl00_mainContent_minutes',
+)
+_TIME_PERIOD_SELECTORS = (
+    '#ctl00_mainContent_timeOfDay',
+)
+_GO_SELECTORS = (
+    'a#ctl00_mainContent_goBtn',
+    'button:has-text("Go")',
+    'input[value="Go"]',
+    '.goBtn'
+)
+_SWIM_NEXT_SELECTORS = (
+    'button:has-text("Next")',
+    'input[value="Next"]',
+    'a:has-text("Next")'
+)
+_SWIM_TERMS_SELECTORS = (
+    'input#ctl00_mainContent_chkTerms',  # Updated to match actual HTML
+    'input#ctl00_mainContent_Terms'  # Keep old one as fallback
+)
+
+# Shared S3 client, created on first use so boto3 stays an optional import
+_S3_CLIENT = None
+
+def _get_s3_client():
+    """Return the shared S3 client, creating it on first use"""
+    global _S3_CLIENT
+    if _S3_CLIENT is None:
+        import boto3
+        from botocore.config import Config
+        # The schedule is a tiny object: fail fast and retry once rather than
+        # stalling a booking window on the default backoff and open-ended connects
+        _S3_CLIENT = boto3.client(
+            's3',
+            config=Config(
+                max_pool_connections=8,
+                retries={'max_attempts': 2, 'mode': 'standard'},
+                connect_timeout=2,
+                read_timeout=5
+            )
+        )
+    return _S3_CLIENT
+
+@functools.lru_cache(maxsize=256)
+def _parse_month_year_cached(cleaned: str):
+    """Parse a whitespace-normalised 'November 2025' title; cached as the datepicker repeats titles"""
+    for fmt in ("%B %Y", "%b %Y"):
+        try:
+            parsed = datetime.strptime(cleaned, fmt)
+            return parsed.replace(day=1)
+        except ValueError:
+            continue
+    return None
+
+# Swim booking time-of-day dropdown labels for each time period
+_TIME_PERIOD_KEYWORDS = {
+    "morning": ("Morning (Before 12:00)",),
+    "afternoon": ("Afternoon (12:00 - 17:00)",),
+    "evening": ("Evening (After 17:00)",)
+}
+
+# Swim booking time-of-day dropdown bucket for each hour
+_TIME_PERIOD_BY_HOUR = {
+    hour: "morning" if hour < 12 else "afternoon" if hour < 17 else "evening"
+    for hour in range(24)
+}
+
+@functools.lru_cache(maxsize=128)
+def _infer_time_period_cached(specific_time: str) -> str:
+    """Map an "HH:MM" time to its time period; unparseable times default to morning"""
+    try:
+        hour = int(specific_time.split(':')[0])
+    except ValueError:
+        return "morning"
+    return _TIME_PERIOD_BY_HOUR.get(hour, "morning")
+
+@functools.lru_cache(maxsize=64)
+def _parse_swim_instructor_cached(instructor: str) -> Optional[tuple[bool, int]]:
+    """Parse an instructor into (is_swim, duration); None for a malformed swim entry"""
+    instructor_lower = instructor.lower()
+    if not instructor_lower.startswith('swim'):
+        return False, 0
+    
+    # Extract duration from "Swim(30)" format
+    match = _SWIM_RE.search(instructor_lower)
+    if match:
+        duration = int(match.group(1))
+        if duration in [15, 30]:
+            return True, duration
+    return None
+
+@functools.lru_cache(maxsize=32)
+def _selector_union(selectors: tuple[str, ...]) -> str:
+    """Join a selector tuple into one comma-separated selector, once per tuple"""
+    return ', '.join(selectors)
+
+def _normalize_day_token(token: str) -> str:
+    """Collapse whitespace and lowercase a day token to match the in-page classifier's labels"""
+    return _WS_RE.sub(' ', token).strip().lower()
+
+# Local Chromium installs to try on macOS, most common first
+_LOCAL_CHROMIUM_PATHS = (
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+    '/usr/local/bin/chromium',
+    '/opt/homebrew/bin/chromium',
+    '/Applications/Chromium.app/Contents/MacOS/Chromium'
+)
+
+@functools.lru_cache(maxsize=1)
+def _detect_browser_environment_cached():
+    """Detect if running locally and find available browser; constant for the process lifetime"""
+    is_local = (
+        os.getenv('RENDER') is None and  # Not on Render
+        platform.system() == 'Darwin'   # macOS (local machine)
+    )
+    
+    if is_local:
+        print("🏠 Running locally - using local Chromium installation")
+        # One listing of /Applications rules out missing .app bundles without a stat each;
+        # a listed bundle still has its executable checked, as it may be incomplete
+        try:
+            with os.scandir('/Applications') as entries:
+                installed_apps = {entry.name for entry in entries}
+        except OSError:
+            installed_apps = set()
+        
+        def is_installed(path: str) -> bool:
+            if path.startswith('/Applications/') and path.split('/')[2] not in installed_apps:
+                return False
+            return os.path.exists(path)
+        
+        # Stops probing at the first install found
+        path = next((path for path in _LOCAL_CHROMIUM_PATHS if is_installed(path)), None)
+        if path:
+            print(f"✅ Found browser at: {path}")
+            return True, path
+        
+        print("⚠️  No local browser found, trying default Playwright installation")
+        return True, None
+    else:
+        print("☁️  Running on Render - using Playwright's bundled Chromium")
+        return False, None
+
+# Month/year heading inside the datepicker, in order of preference
+_DATEPICKER_TITLE_SELECTORS = (
+    '.uk-datepicker-nav .uk-datepicker-title',
+    '.uk-datepicker-title',
+    '.ui-datepicker-title',
+    '.uk-datepicker-heading'
+)
+
+# Reads the first non-empty title under a datepicker, trying the selectors in order
+_DATEPICKER_TITLE_JS = """(root, titleSelectors) => {
+    for (const selector of titleSelectors) {
+        const el = root.querySelector(selector);
+        const text = el ? (el.textContent || '').trim() : '';
+        if (text) {
+            return text;
+        }
+    }
+    return '';
+}"""
+
+# Resolves once the newest datepicker's title differs from the one shown before a nav click
+_DATEPICKER_TITLE_CHANGED_JS = """({calendarSelector, titleSelectors, previous}) => {
+    const calendars = document.querySelectorAll(calendarSelector);
+    const calendar = calendars[calendars.length - 1];
+    if (!calendar) {
+        return false;
+    }
+    for (const selector of titleSelectors) {
+        const el = calendar.querySelector(selector);
+        const text = el && el.textContent ? el.textContent.trim() : '';
+        if (text) {
+            return text !== previous;
+        }
+    }
+    return false;
+}"""
+
+# Finds the datepicker cell for the target day, tags it with data-booking-target and
+# reports how it was matched; data-date attributes win over visible day numbers
+_MARK_DATEPICKER_DAY_JS = """(root, {iso, dataSelectors, dayStrings, blocklist}) => {
+    const marker = 'data-booking-target';
+    for (const el of root.querySelectorAll('[' + marker + ']')) {
+        el.removeAttribute(marker);
+    }
+    const isBlocked = (classes) => blocklist.some((token) => classes.includes(token));
+
+    for (const selector of dataSelectors) {
+        for (const el of root.querySelectorAll(selector)) {
+            if (isBlocked((el.getAttribute('class') || '').toLowerCase())) {
+                continue;
+            }
+            el.setAttribute(marker, '1');
+            return { source: 'data-date', label: el.getAttribute('data-date') || '' };
+        }
+    }
+
+    // Fallback: match by visible text while avoiding disabled/off-month cells
+    for (const cell of root.querySelectorAll('td')) {
+        const clickable = cell.querySelector('a, button');
+        const classes = (cell.getAttribute('class') || '') + ' ' + (clickable ? clickable.getAttribute('class') || '' : '');
+        if (isBlocked(classes.toLowerCase())) {
+            continue;
+        }
+        const dataDate = (clickable && clickable.getAttribute('data-date')) || cell.getAttribute('data-date') || '';
+        if (dataDate && !dataDate.startsWith(iso)) {
+            continue;
+        }
+        const target = clickable || cell;
+        const text = (target.textContent || '').trim();
+        if (dayStrings.includes(text)) {
+            target.setAttribute(marker, '1');
+            return { source: clickable ? 'text' : 'cell', label: text };
+        }
+    }
+    return null;
+}"""
+
+# Wrappers that delimit one day's classes on the calendar, most specific first
+_DAY_SCOPE_SELECTORS = (
+    '.classCalendarDay',
+    '.classDayWrapper',
+    '.classWeekDay',
+    '.dayWrap',
+    '.uk-accordion-content',
+    '.uk-panel',
+    '.day-wrapper',
+    '.classDay'
+)
+
+# Walks up from a day header to the first day-scope wrapper, in _DAY_SCOPE_SELECTORS order
+_DAY_SCOPE_JS = """(node) => {
+    const scopes = [""" + ', '.join(f"'{selector}'" for selector in _DAY_SCOPE_SELECTORS) + """];
+    for (const selector of scopes) {
+        const match = node.closest(selector);
+        if (match) {
+            return match;
+        }
+    }
+    return node;
+}"""
+
+# Browser-side classifier deciding whether a class container belongs to the requested day;
+# expects targets normalised with _normalize_day_token
+_CONTAINER_MATCH_JS = """(node, targets) => {
+    const response = { match: false, label: '' };
+    if (!node) {
+        return response;
+    }
+
+    const dayWrapper = node.closest('""" + ', '.join(_DAY_SCOPE_SELECTORS) + """');
+    const labelSelectors = [
+        '.classDayTitle',
+        '.classDayHeader',
+        '.classDayName',
+        '.dayTitle',
+        '.uk-accordion-title',
+        'header',
+        'h1',
+        'h2',
+        'h3'
+    ];
+    const attrCandidates = [
+        'data-date',
+        'data-day',
+        'data-classdate',
+        'data-class-date',
+        'data-class-date-iso'
+    ];
+
+    const wrapper = dayWrapper || node;
+    let label = '';
+
+    for (const selector of labelSelectors) {
+        const headerEl = wrapper.querySelector(selector);
+        if (headerEl && headerEl.textContent) {
+            label = headerEl.textContent;
+            break;
+        }
+    }
+
+    if (!label) {
+        for (const attr of attrCandidates) {
+            const value = wrapper.getAttribute(attr) || node.getAttribute(attr);
+            if (value) {
+                label = value;
+                break;
+            }
+        }
+    }
+
+    if (!label && wrapper.textContent) {
+        label = wrapper.textContent;
+    }
+
+    const normalizedLabel = (label || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+
+    // Targets arrive already whitespace-collapsed and lowercased from Python
+    for (const target of targets || []) {
+        if (target && normalizedLabel.includes(target)) {
+            response.match = true;
+            response.label = label ? label.trim() : '';
+            return response;
+        }
+    }
+
+    response.label = label ? label.trim() : '';
+    return response;
+}"""
+
+# Runs the classifier over a whole list of containers in one round-trip
+_CLASSIFY_CONTAINERS_JS = (
+    "([nodes, targets]) => { const classify = " + _CONTAINER_MATCH_JS
+    + "; return nodes.map((node) => classify(node, targets)); }"
+)
+
+# Marks a class tile with data-booking-id and returns its index among all class tiles
+_TAG_CONTAINER_JS = """(el, bookingId) => {
+    el.setAttribute('data-booking-id', bookingId);
+    return Array.from(document.querySelectorAll('div.classDesktopWrapper')).indexOf(el);
+}"""
+
+# Indices of the class tiles whose text mentions the instructor and the class time;
+# expects lowercased search terms
+_SCAN_CONTAINERS_JS = """({instructor, time, timeNoColon}) => {
+    const indices = [];
+    document.querySelectorAll('div.classDesktopWrapper').forEach((el, i) => {
+        const text = (el.textContent || '').toLowerCase();
+        if (text.includes(instructor) && (text.includes(time) || text.includes(timeNoColon))) {
+            indices.push(i);
+        }
+    });
+    return indices;
+}"""
+
+# First <option> of a <select> whose text contains one of the tokens, as {text, value, index}
+_FIND_SELECT_OPTION_JS = """(el, {tokens, normaliseMins}) => {
+    for (let index = 0; index < el.options.length; index++) {
+        const option = el.options[index];
+        const text = (option.textContent || '').trim();
+        if (!text) {
+            continue;
+        }
+        const haystack = normaliseMins ? text.toLowerCase().replace(/mins/g, 'min') : text;
+        if (tokens.some((token) => haystack.includes(token))) {
+            return { text, value: (option.value || '').trim(), index };
+        }
+    }
+    return null;
+}"""
+
+# First swim lane booking button, in lane priority order, whose start time is exactly the
+# requested one; returns {lane, index}, or {lane: null, laneCount} when none is free
+_FIND_LANE_SLOT_JS = """({priority, time}) => {
+    const lanes = document.querySelectorAll('div.timeSlotInner');
+    for (const lane of priority) {
+        const inner = lanes[lane - 1];
+        if (!inner) {
+            continue;
+        }
+        const buttons = inner.querySelectorAll('a.bookButton');
+        for (let index = 0; index < buttons.length; index++) {
+            const match = (buttons[index].textContent || '').match(/\\b(\\d{1,2}:\\d{2})\\b/);
+            if (match && match[1] === time) {
+                return { lane, index };
+            }
+        }
+    }
+    return { lane: null, laneCount: lanes.length };
+}"""
+
+# Truthy once a lane in the given priority list holds the requested start time; polled so
+# lanes that render after the first ones get a chance before a fallback lane is chosen
+_LANE_SLOT_FOUND_JS = "(arg) => (" + _FIND_LANE_SLOT_JS + ")(arg).lane !== null"
+
+# Truthy once a class overlay has rendered a visible booking button
+_BOOK_BUTTON_VISIBLE_JS = """() => Array.from(
+    document.querySelectorAll('div.classDesktopWrapper a.bookClassButton')
+).some((el) => el.getClientRects().length > 0)"""
+
+# Truthy once the swim lanes have been marked loaded and hold at least one slot
+_TIME_SLOTS_LOADED_JS = """() => document.querySelectorAll(
+    '.timeSlots.loaded .timeSlot, .timeSlots.loaded a.bookButton'
+).length > 0"""
+
 class GymBookingBot:
-    def __init__(self, user_name: str = "peter"):
+    # Browser shared by every bot in the process (see shared_browser)
+    _shared_browser: Optional[Browser] = None
+    # Logged-in SMTP connection reused across failure emails (see _get_smtp)
+    _smtp_conn: Optional[smtplib.SMTP] = None
+    # Failure emails are sent from worker threads, so the shared connection needs a lock
+    _smtp_lock = threading.Lock()
+
+    def __init__(self, user_name: str = "peter", username: Optional[str] = None, password: Optional[str] = None,
+                 browser: Optional[Browser] = None):
         gym_url = os.getenv('GYM_URL')
         if not gym_url:
             raise ValueError("Please set GYM_URL in your .env file")
         self.gym_url: str = gym_url
         self.user_name = user_name.upper()
         
-        # Load credentials for the specified user
-        username = os.getenv(f'{self.user_name}_USERNAME')
-        password = os.getenv(f'{self.user_name}_PASSWORD')
+        # Load credentials for the specified user unless they were passed in
+        username = username or os.getenv(f'{self.user_name}_USERNAME')
+        password = password or os.getenv(f'{self.user_name}_PASSWORD')
         if not username or not password:
             raise ValueError(f"Please set {self.user_name}_USERNAME and {self.user_name}_PASSWORD in your .env file")
         self.username: str = username
         self.password: str = password
         self.headless = os.getenv('HEADLESS', 'false').lower() == 'true'
+        self.browser = browser
+        # In-flight calendar prefetches keyed by the page that logged in
+        self._calendar_prefetch: dict = {}
 
-    def _detect_browser_environment(self):
-        """Detect if running locally and find available browser"""
-        import platform
+    @classmethod
+    async def shared_browser(cls, playwright, headless: bool = True, executable_path: Optional[str] = None) -> Browser:
+        """
+        Return the process-wide browser, launching it on first use
         
-        is_local = (
-            os.getenv('RENDER') is None and  # Not on Render
-            platform.system() == 'Darwin'   # macOS (local machine)
-        )
+        Args:
+            playwright: Running Playwright instance
+            headless: Whether to launch Chromium headless
+            executable_path: Local Chromium executable, or None for Playwright's bundled one
+            
+        Returns:
+            Shared Playwright browser
+        """
+        if cls._shared_browser is None or not cls._shared_browser.is_connected():
+            if executable_path:
+                cls._shared_browser = await playwright.chromium.launch(
+                    headless=headless,
+                    executable_path=executable_path
+                )
+            else:
+                cls._shared_browser = await playwright.chromium.launch(headless=headless)
+        return cls._shared_browser
+
+    @classmethod
+    async def close_shared_browser(cls):
+        """Close the process-wide browser if one was launched"""
+        browser, cls._shared_browser = cls._shared_browser, None
+        if browser:
+            await browser.close()
+
+    @classmethod
+    def _get_smtp(cls, smtp_server: str, smtp_port: int, smtp_user: str, smtp_password: str) -> smtplib.SMTP:
+        """
+        Return the shared SMTP connection, reconnecting if the server dropped it
         
-        if is_local:
-            print("🏠 Running locally - using local Chromium installation")
-            local_chromium_paths = [
-                '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
-                '/usr/local/bin/chromium',
-                '/opt/homebrew/bin/chromium',
-                '/Applications/Chromium.app/Contents/MacOS/Chromium'
-            ]
+        Callers must hold _smtp_lock.
+        
+        Args:
+            smtp_server: SMTP host
+            smtp_port: SMTP port (STARTTLS)
+            smtp_user: Login user
+            smtp_password: Login password
             
-            for path in local_chromium_paths:
-                if os.path.exists(path):
-                    print(f"✅ Found browser at: {path}")
-                    return True, path
+        Returns:
+            Logged-in SMTP connection
+        """
+        if cls._smtp_conn is not None:
+            try:
+                if cls._smtp_conn.noop()[0] == 250:
+                    return cls._smtp_conn
+            except (smtplib.SMTPException, OSError):
+                pass
+            cls._discard_smtp()
+        
+        server = smtplib.SMTP(smtp_server, smtp_port, timeout=_SMTP_TIMEOUT_SECONDS)
+        try:
+            server.starttls()
+            server.login(smtp_user, smtp_password)
+        except Exception:
+            server.close()
+            raise
+        cls._smtp_conn = server
+        return server
+
+    @classmethod
+    def _discard_smtp(cls):
+        """Politely close the shared SMTP connection, ignoring a server that already hung up"""
+        server, cls._smtp_conn = cls._smtp_conn, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    @classmethod
+    def close_smtp(cls):
+        """Close the shared SMTP connection if one was opened"""
+        with cls._smtp_lock:
+            cls._discard_smtp()
+
+    async def new_context(self, storage_state: Optional[str] = None) -> BrowserContext:
+        """
+        Open an isolated browser context for this user on the injected browser
+        
+        Args:
+            storage_state: Optional path to saved cookies/storage to start the context with
             
-            print("⚠️  No local browser found, trying default Playwright installation")
-            return True, None
-        else:
-            print("☁️  Running on Render - using Playwright's bundled Chromium")
-            return False, None
+        Returns:
+            Browser context with a realistic user agent and fail-fast timeouts
+        """
+        if self.browser is None:
+            raise ValueError("GymBookingBot needs a browser to open a context")
+        
+        # Create context with realistic user agent to avoid bot detection
+        context = await self.browser.new_context(
+            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36',
+            storage_state=storage_state
+        )
+        
+        # Fail fast on individual actions instead of Playwright's 30s defaults
+        context.set_default_timeout(_ACTION_TIMEOUT_MS)
+        context.set_default_navigation_timeout(_NAVIGATION_TIMEOUT_MS)
+        return context
+
+    @staticmethod
+    def _detect_browser_environment():
+        """Detect if running locally and find available browser (cached for the process)"""
+        return _detect_browser_environment_cached()
 
     async def _navigate_datepicker_to_date(self, page: Page, calendar_selector: str, target_date: datetime) -> bool:
         """Navigate the UIkit datepicker to the desired month and click the target day."""
@@ -109,125 +672,56 @@ class GymBookingBot:
                 if not await self._click_datepicker_nav(calendar, ['.uk-datepicker-prev', '.ui-datepicker-prev', '[data-uk-datepicker-previous]', '.uk-datepicker-previous']):
                     return False
 
-            await page.wait_for_timeout(400)
+            # Wait for the title to change rather than sleeping a fixed interval
+            try:
+                await page.wait_for_function(
+                    _DATEPICKER_TITLE_CHANGED_JS,
+                    arg={
+                        'calendarSelector': calendar_selector,
+                        'titleSelectors': list(_DATEPICKER_TITLE_SELECTORS),
+                        'previous': title_text
+                    },
+                    timeout=2000
+                )
+            except Exception:
+                await page.wait_for_timeout(400)
 
         return False
 
-    async def _container_matches_day(self, container, target_texts: list[str]) -> tuple[bool, str]:
-        """Check whether a class container belongs to the requested day using lightweight DOM inspection."""
-        if not container:
-            return False, ""
-
-        script = """(node, targets) => {
-            const response = { match: false, label: '' };
-            if (!node) {
-                return response;
-            }
-
-            const dayWrapper = node.closest('.classCalendarDay, .classDayWrapper, .classWeekDay, .dayWrap, .uk-accordion-content, .uk-panel, .day-wrapper, .classDay');
-            const labelSelectors = [
-                '.classDayTitle',
-                '.classDayHeader',
-                '.classDayName',
-                '.dayTitle',
-                '.uk-accordion-title',
-                'header',
-                'h1',
-                'h2',
-                'h3'
-            ];
-            const attrCandidates = [
-                'data-date',
-                'data-day',
-                'data-classdate',
-                'data-class-date',
-                'data-class-date-iso'
-            ];
-
-            const wrapper = dayWrapper || node;
-            let label = '';
-
-            for (const selector of labelSelectors) {
-                const headerEl = wrapper.querySelector(selector);
-                if (headerEl && headerEl.textContent) {
-                    label = headerEl.textContent;
-                    break;
-                }
-            }
-
-            if (!label) {
-                for (const attr of attrCandidates) {
-                    const value = wrapper.getAttribute(attr) || node.getAttribute(attr);
-                    if (value) {
-                        label = value;
-                        break;
-                    }
-                }
-            }
-
-            if (!label && wrapper.textContent) {
-                label = wrapper.textContent;
-            }
-
-            const normalizedLabel = (label || '').replace(/\\s+/g, ' ').trim().toLowerCase();
-
-            for (const target of targets || []) {
-                const normalizedTarget = String(target || '').replace(/\\s+/g, ' ').trim().toLowerCase();
-                if (normalizedTarget && normalizedLabel.includes(normalizedTarget)) {
-                    response.match = true;
-                    response.label = label ? label.trim() : '';
-                    return response;
-                }
-            }
-
-            response.label = label ? label.trim() : '';
-            return response;
-        }"""
+    async def _classify_containers_by_day(self, page: Page, containers: list, target_texts: list[str]) -> list[tuple[bool, str]]:
+        """Check many class containers against the requested day in a single page.evaluate call."""
+        if not containers:
+            return []
 
         try:
-            result = await container.evaluate(script, target_texts)
+            results = await page.evaluate(_CLASSIFY_CONTAINERS_JS, [containers, target_texts])
         except Exception:
-            return False, ""
+            return [(False, "")] * len(containers)
 
-        if not isinstance(result, dict):
-            return False, ""
+        if not isinstance(results, list) or len(results) != len(containers):
+            return [(False, "")] * len(containers)
 
-        matches = bool(result.get('match'))
-        label = (result.get('label') or "").strip()
-        return matches, label
+        classified = []
+        for result in results:
+            if not isinstance(result, dict):
+                classified.append((False, ""))
+                continue
+            classified.append((bool(result.get('match')), (result.get('label') or "").strip()))
+        return classified
 
     async def _get_datepicker_title(self, calendar) -> str:
-        """Extract the month/year title text from the datepicker."""
-        title_selectors = [
-            '.uk-datepicker-nav .uk-datepicker-title',
-            '.uk-datepicker-title',
-            '.ui-datepicker-title',
-            '.uk-datepicker-heading'
-        ]
-        for selector in title_selectors:
-            try:
-                element = await calendar.query_selector(selector)
-                if element:
-                    text = await element.text_content()
-                    if text:
-                        return text.strip()
-            except Exception:
-                continue
-        return ""
+        """Extract the month/year title text from the datepicker in one round-trip."""
+        try:
+            return await calendar.evaluate(_DATEPICKER_TITLE_JS, list(_DATEPICKER_TITLE_SELECTORS)) or ""
+        except Exception:
+            return ""
 
     def _parse_month_year_title(self, text: str):
         """Parse strings like 'November 2025' into a datetime at the first of the month."""
         if not text:
             return None
 
-        cleaned = re.sub(r'\s+', ' ', text.strip())
-        for fmt in ("%B %Y", "%b %Y"):
-            try:
-                parsed = datetime.strptime(cleaned, fmt)
-                return parsed.replace(day=1)
-            except ValueError:
-                continue
-        return None
+        return _parse_month_year_cached(_WS_RE.sub(' ', text.strip()))
 
     async def _click_datepicker_nav(self, calendar, selectors: list[str]) -> bool:
         """Click the next/previous navigation button."""
@@ -251,8 +745,8 @@ class GymBookingBot:
     async def _click_datepicker_day(self, calendar, target_date: datetime) -> bool:
         """Click the day cell matching the target date."""
         iso_target = target_date.strftime('%Y-%m-%d')
-        day_strings = {str(target_date.day), target_date.strftime('%d')}
-        class_blocklist = ('disabled', 'empty', 'off', 'out', 'outside', 'muted')
+        day_strings = sorted({str(target_date.day), target_date.strftime('%d')})
+        class_blocklist = ['disabled', 'empty', 'off', 'out', 'outside', 'muted']
 
         # Prefer exact data-date matches if available
         data_selectors = [
@@ -263,84 +757,47 @@ class GymBookingBot:
             f'[data-date^="{iso_target} "]',
             f'[data-date^="{iso_target}"]',
         ]
-        for selector in data_selectors:
-            try:
-                elements = await calendar.query_selector_all(selector)
-                for element in elements:
-                    if not element:
-                        continue
-                    classes = (await element.get_attribute('class') or '').lower()
-                    if any(token in classes for token in class_blocklist):
-                        continue
-                    try:
-                        await element.scroll_into_view_if_needed()
-                    except Exception:
-                        pass
-                    try:
-                        data_value = await element.get_attribute('data-date')
-                    except Exception:
-                        data_value = None
-                    print(f"🗓️  Selecting day using data-date match: {data_value or 'unknown'}")
-                    try:
-                        await element.click(force=True)
-                    except Exception:
-                        await element.click()
-                    return True
-            except Exception:
-                continue
 
-        # Fallback: match by visible text while avoiding disabled/off-month cells
+        # Run the whole search in the page and mark the winning element, so picking
+        # the day costs one round-trip instead of several per candidate cell
         try:
-            cells = await calendar.query_selector_all('td')
+            match = await calendar.evaluate(
+                _MARK_DATEPICKER_DAY_JS,
+                {
+                    'iso': iso_target,
+                    'dataSelectors': data_selectors,
+                    'dayStrings': day_strings,
+                    'blocklist': class_blocklist
+                }
+            )
+            element = await calendar.query_selector('[data-booking-target="1"]') if match else None
         except Exception:
-            cells = []
+            return False
 
-        for cell in cells:
-            try:
-                cell_classes = (await cell.get_attribute('class') or '').lower()
-                clickable = await cell.query_selector('a, button')
-                clickable_classes = (await clickable.get_attribute('class') or '').lower() if clickable else ''
-                combined_classes = f"{cell_classes} {clickable_classes}"
-                if any(token in combined_classes for token in class_blocklist):
-                    continue
+        if not element:
+            return False
 
-                data_date = ''
-                if clickable:
-                    data_date = (await clickable.get_attribute('data-date')) or ''
-                if not data_date:
-                    data_date = (await cell.get_attribute('data-date')) or ''
+        try:
+            await element.scroll_into_view_if_needed()
+        except Exception:
+            pass
 
-                if data_date and not data_date.startswith(iso_target):
-                    continue
+        label = match.get('label') or ''
+        if match.get('source') == 'data-date':
+            print(f"🗓️  Selecting day using data-date match: {label or 'unknown'}")
+        elif match.get('source') == 'text':
+            print(f"🗓️  Selecting day by visible text: {label}")
+        else:
+            print(f"🗓️  Selecting day by cell text: {label}")
 
-                text_source = clickable if clickable else cell
-                text = (await text_source.text_content() or '').strip()
-                if text in day_strings:
-                    if clickable:
-                        try:
-                            await clickable.scroll_into_view_if_needed()
-                        except Exception:
-                            pass
-                        print(f"🗓️  Selecting day by visible text: {text}")
-                        try:
-                            await clickable.click(force=True)
-                        except Exception:
-                            await clickable.click()
-                    else:
-                        try:
-                            await cell.scroll_into_view_if_needed()
-                        except Exception:
-                            pass
-                        print(f"🗓️  Selecting day by cell text: {text}")
-                        try:
-                            await cell.click(force=True)
-                        except Exception:
-                            await cell.click()
-                    return True
+        try:
+            try:
+                await element.click(force=True)
             except Exception:
-                continue
-
-        return False
+                await element.click()
+        except Exception:
+            return False
+        return True
 
     async def _get_input_value(self, element) -> str:
         """Safely get the live value of an input element."""
@@ -358,7 +815,7 @@ class GymBookingBot:
                     return ""
 
     def _send_booking_failure_email(self, booking_details: dict, failure_reason: str, error_details: str = ""):
-        """Send email notification when a booking fails"""
+        """Send email notification when a booking fails; blocking, so async callers run it via asyncio.to_thread"""
         try:
             # Get email configuration from environment variables
             smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
@@ -409,33 +866,60 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             
             msg.attach(MIMEText(body, 'plain'))
             
-            # Send email
-            server = smtplib.SMTP(smtp_server, smtp_port)
-            server.starttls()
-            server.login(smtp_user, smtp_password)
+            # Send email over the shared connection
             text = msg.as_string()
-            server.sendmail(smtp_user, notification_email, text)
-            server.quit()
+            with GymBookingBot._smtp_lock:
+                server = self._get_smtp(smtp_server, smtp_port, smtp_user, smtp_password)
+                try:
+                    server.sendmail(smtp_user, notification_email, text)
+                except smtplib.SMTPServerDisconnected:
+                    # Dropped between NOOP and send; reconnect once
+                    GymBookingBot._discard_smtp()
+                    server = self._get_smtp(smtp_server, smtp_port, smtp_user, smtp_password)
+                    server.sendmail(smtp_user, notification_email, text)
             
             print(f"📧 Failure notification email sent to {notification_email}")
             
         except Exception as e:
             print(f"⚠️  Failed to send email notification: {e}")
 
-    async def login(self, page: Page) -> bool:
+    async def is_logged_in(self, page: Page) -> bool:
+        """
+        Check whether the page's context already holds a logged-in session
+        
+        Args:
+            page: Playwright page object
+            
+        Returns:
+            True if the site shows the members area rather than the login form
+        """
+        members_selector = 'h1:has-text("Members Area")'
+        try:
+            await page.goto(self.gym_url, wait_until='domcontentloaded')
+            # Whichever of the members heading or the login form renders first decides it
+            await page.wait_for_selector(
+                f'{members_selector}, input[name="ctl00$mainContent$Login1$UserName"]',
+                timeout=5000
+            )
+            return await page.locator(members_selector).count() > 0
+        except Exception:
+            return False
+
+    async def login(self, page: Page, prefetch_calendar: bool = False) -> bool:
         """
         Log into the Hogarth gym website
         
         Args:
             page: Playwright page object
+            prefetch_calendar: Start fetching the class calendar as soon as the login posts
             
         Returns:
             True if login successful, False otherwise
         """
         try:
             print(f"🌐 Navigating to {self.gym_url}...")
-            await page.goto(self.gym_url)
-            await page.wait_for_load_state('networkidle')
+            # The field waits below cover anything still rendering, so don't wait for network idle
+            await page.goto(self.gym_url, wait_until='domcontentloaded')
             
             # Hogarth-specific login selectors
             login_selectors = [
@@ -446,31 +930,19 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 'input[name="ctl00$mainContent$Login1$Password"]',
             ]
             
-            # Find username field
-            username_field = None
-            for selector in login_selectors:
-                try:
-                    username_field = await page.wait_for_selector(selector, timeout=3000)
-                    if username_field:
-                        break
-                except:
-                    continue
-            
-            if not username_field:
+            # Find username field (one lazy locator across all candidate selectors)
+            username_field = page.locator(', '.join(login_selectors)).first
+            try:
+                await username_field.wait_for(state='visible', timeout=5000)
+            except Exception:
                 print("Could not find username field. Please check the website structure.")
                 return False
             
             # Find password field
-            password_field = None
-            for selector in password_selectors:
-                try:
-                    password_field = await page.wait_for_selector(selector, timeout=3000)
-                    if password_field:
-                        break
-                except:
-                    continue
-            
-            if not password_field:
+            password_field = page.locator(', '.join(password_selectors)).first
+            try:
+                await password_field.wait_for(state='visible', timeout=5000)
+            except Exception:
                 print("Could not find password field. Please check the website structure.")
                 return False
             
@@ -484,16 +956,14 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 'a#ctl00_mainContent_Login1_LoginImageButton',
             ]
             
-            submit_button = None
-            for selector in submit_selectors:
-                try:
-                    submit_button = await page.wait_for_selector(selector, timeout=3000)
-                    if submit_button:
-                        break
-                except:
-                    continue
+            submit_button = page.locator(', '.join(submit_selectors)).first
+            try:
+                await submit_button.wait_for(state='visible', timeout=5000)
+                submit_found = True
+            except Exception:
+                submit_found = False
             
-            if submit_button:
+            if submit_found:
                 print("Clicking login button...")
                 await submit_button.click()
             else:
@@ -501,8 +971,12 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 print("No submit button found, pressing Enter...")
                 await password_field.press('Enter')
             
-            # Wait for login to complete
-            await page.wait_for_load_state('networkidle')
+            # Wait for login to complete; the Members Area check below waits for the page itself
+            await page.wait_for_load_state('domcontentloaded')
+            
+            if prefetch_calendar:
+                # Shares the page's cookies, so this warms the ASP.NET session without touching the page
+                self._calendar_prefetch[page] = asyncio.create_task(page.context.request.get(_CLASS_CALENDAR_URL))
             
             # Check if login was successful by looking for a known post-login element
             success_selector = 'h1:has-text("Members Area")'
@@ -521,6 +995,137 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             print(f"❌ Login error for {self.user_name}: {e}")
             return False
 
+    async def _await_calendar_prefetch(self, page: Page):
+        """
+        Let the calendar prefetch started by login finish and release its response
+        
+        Args:
+            page: Playwright page object the prefetch was started for
+        """
+        task = self._calendar_prefetch.pop(page, None)
+        if task is None:
+            return
+        try:
+            response = await task
+            await response.dispose()
+        except Exception as e:
+            print(f"⚠️  Calendar prefetch failed: {e}")
+
+    def cancel_calendar_prefetch(self, page: Page):
+        """
+        Drop a calendar prefetch that book_class never collected (e.g. login-only runs)
+        
+        Args:
+            page: Playwright page object the prefetch was started for
+        """
+        task = self._calendar_prefetch.pop(page, None)
+        if task is not None:
+            task.cancel()
+
+    async def _wait_for_calendar_ready(self, page: Page):
+        """
+        Wait until a class calendar week is usable, without waiting for the network to go idle
+        
+        Args:
+            page: Playwright page object
+        """
+        await page.wait_for_load_state('domcontentloaded')
+        try:
+            await page.wait_for_selector(_CALENDAR_READY_SELECTOR, timeout=8000)
+        except Exception:
+            print("⚠️  Class calendar not ready after 8s, continuing")
+
+    async def _wait_for_first(self, root, selectors: tuple[str, ...], timeout: int, state: str = 'visible'):
+        """
+        Wait once for any of the selectors, then pick the highest-priority one that matched
+        
+        Args:
+            root: Page or element handle to search within
+            selectors: Candidate selectors, most preferred first
+            timeout: Milliseconds to wait for any candidate to appear
+            state: 'visible' to only accept visible matches, 'attached' to accept any
+            
+        Returns:
+            Tuple of (element handle, selector), or (None, None) if nothing appeared in time
+        """
+        try:
+            await root.wait_for_selector(_selector_union(tuple(selectors)), state=state, timeout=timeout)
+        except Exception:
+            return None, None
+        
+        # The union resolves on whichever candidate comes first in the document;
+        # honour the list's priority order when choosing among those present
+        for selector in selectors:
+            try:
+                handle = await root.query_selector(f'{selector} >> visible=true' if state == 'visible' else selector)
+            except Exception:
+                continue
+            if handle:
+                return handle, selector
+        return None, None
+
+    async def _race_selectors(self, page: Page, selectors: tuple[str, ...], timeout: int):
+        """
+        Wait for several selectors concurrently and return as soon as any of them appears
+        
+        Args:
+            page: Playwright page object
+            selectors: Candidate selectors; list order breaks ties between simultaneous matches
+            timeout: Milliseconds each candidate may wait
+            
+        Returns:
+            Tuple of (element handle, selector), or (None, None) if none appeared in time
+        """
+        tasks = {asyncio.create_task(page.wait_for_selector(selector, timeout=timeout)): selector for selector in selectors}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Inspect every finished task so no exception is left unretrieved
+                found = [task for task in done if task.exception() is None and task.result()]
+                if found:
+                    winner = min(found, key=lambda task: selectors.index(tasks[task]))
+                    return winner.result(), tasks[winner]
+            return None, None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _find_select_option(self, select, tokens: list[str], normalise_mins: bool = False) -> Optional[dict]:
+        """
+        Find the first <option> whose text contains any of the tokens in one evaluate call
+        
+        Args:
+            select: Locator or element handle for the <select>
+            tokens: Substrings to look for in the option text
+            normalise_mins: Lowercase option text and read 'mins' as 'min' before matching
+            
+        Returns:
+            Dict with the option's 'text', 'value' and 'index', or None if nothing matched
+        """
+        try:
+            return await select.evaluate(_FIND_SELECT_OPTION_JS, {'tokens': tokens, 'normaliseMins': normalise_mins})
+        except Exception as e:
+            print(f"⚠️  Could not read dropdown options: {e}")
+            return None
+
+    async def _scan_containers(self, page: Page, instructor: str, time: str) -> list[int]:
+        """
+        Find the class containers mentioning the instructor and time (case-insensitive) in one page.evaluate call
+        
+        Args:
+            page: Playwright page object
+            instructor: Instructor name
+            time: Class time (HH:MM format)
+            
+        Returns:
+            Indices into page's div.classDesktopWrapper list, in document order
+        """
+        return await page.evaluate(
+            _SCAN_CONTAINERS_JS,
+            {'instructor': instructor.lower(), 'time': time.lower(), 'timeNoColon': time.replace(':', '').lower()}
+        )
+
     async def book_class(self, page: Page, target_date: datetime, instructor: str, time: str) -> bool:
         """
         Book a gym class by instructor and time at Hogarth gym
@@ -540,23 +1145,26 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             # Step 1: Try to navigate to Class Calendar page (stay within authenticated session)
             print("Looking for Classes navigation...")
             
+            await self._await_calendar_prefetch(page)
+            
             # First try to find a classes link on the current authenticated page
             class_link_selectors = [
                 'a[href="../CCE/ClassCalendar.aspx"]',
-                '*:has-text("Classes")',
+                'a:has-text("Classes")',
             ]
             
             navigated = False
             for link_selector in class_link_selectors:
                 try:
                     print(f"Looking for link: {link_selector}")
-                    class_link = await page.wait_for_selector(link_selector, timeout=3000)
-                    if class_link:
-                        print(f"✅ Found classes link: {link_selector}")
-                        await class_link.click()
-                        await page.wait_for_load_state('networkidle')
-                        navigated = True
-                        break
+                    # Candidates stay ordered so the exact href is preferred over the text match
+                    class_link = page.locator(link_selector).first
+                    await class_link.wait_for(state='visible', timeout=3000)
+                    print(f"✅ Found classes link: {link_selector}")
+                    await class_link.click()
+                    await self._wait_for_calendar_ready(page)
+                    navigated = True
+                    break
                 except Exception as e:
                     print(f"⚠️  Link not found: {link_selector}")
                     continue
@@ -571,7 +1179,7 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             print("Clicking Next to advance to bookable week...")
             next_selectors = [
                 'a#ctl00_mainContent_ibNext',
-                '<a:has-text("Next→")',
+                'a:has-text("Next→")',
             ]
 
             next_clicked = False
@@ -581,7 +1189,7 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                     if next_button:
                         print(f"✅ Found Next button: {selector}")
                         await next_button.click()
-                        await page.wait_for_load_state('networkidle')
+                        await self._wait_for_calendar_ready(page)
                         next_clicked = True
                         break
                 except Exception:
@@ -591,19 +1199,14 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 print("❌ Could not find Next button to advance to bookable week")
                 return False
             
-            # Prepare selectors for locating the target day
+            # Prepare a single selector list for locating the target day
             day_header = target_date.strftime('%a %d %b')  # e.g., "Fri 24 Oct"
-            day_selectors = [
-                f'*:has-text("{day_header}")',  # Full format first: "Fri 24 Oct"
-                f'h2:has-text("{day_header}")',
-                f'h3:has-text("{day_header}")',
-                f'h1:has-text("{day_header}")',
-                f'td:has-text("{day_header}")',
-                f'th:has-text("{day_header}")',
-                f'div:has-text("{day_header}")',
-            ]
+            day_selector_union = ', '.join(
+                f'{tag}:has-text("{day_header}")' for tag in ('*', 'h2', 'h3', 'h1', 'td', 'th', 'div')
+            )
             
-            # Build search tokens for identifying the correct day container (keep list minimal but distinctive)
+            # Build search tokens for identifying the correct day container (keep list minimal but distinctive).
+            # Tokens are normalised once here so the in-page classifier can compare them directly.
             day_tokens = []
             for token in [
                 day_header,
@@ -612,29 +1215,29 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 target_date.strftime('%d %B %Y'),
                 target_date.strftime('%d/%m/%Y')
             ]:
-                if token not in day_tokens:
+                token = _normalize_day_token(token)
+                if token and token not in day_tokens:
                     day_tokens.append(token)
 
             async def find_day_section():
                 """Locate the wrapper containing the target day's schedule."""
                 # First, look for the standard classWrapper day containers
                 wrappers = await page.query_selector_all('div.classWrapper')
-                for wrapper in wrappers:
-                    matches, label = await self._container_matches_day(wrapper, day_tokens)
+                wrapper_results = await self._classify_containers_by_day(page, wrappers, day_tokens)
+                for wrapper, (matches, label) in zip(wrappers, wrapper_results):
                     if matches:
                         return wrapper, (label or day_header), 'div.classWrapper'
 
-                # Fall back to the broader selector list in case markup changes slightly
-                for selector in day_selectors:
-                    try:
-                        candidate = await page.query_selector(selector)
-                    except Exception:
-                        continue
-                    if not candidate:
-                        continue
-                    matches, label = await self._container_matches_day(candidate, day_tokens)
+                # Fall back to anything mentioning the day header in case markup changes slightly;
+                # one query and one classification pass, first match in document order wins
+                try:
+                    candidates = await page.query_selector_all(day_selector_union)
+                except Exception:
+                    return None, "", ""
+                candidate_results = await self._classify_containers_by_day(page, candidates, day_tokens)
+                for candidate, (matches, label) in zip(candidates, candidate_results):
                     if matches:
-                        return candidate, (label or day_header), selector
+                        return candidate, (label or day_header), f':has-text("{day_header}")'
                 return None, "", ""
 
             # Step 2: Check if the target day is already visible; otherwise advance the calendar
@@ -654,7 +1257,7 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 print("Clicking Next to advance to bookable week...")
                 next_selectors = [
                     'a#ctl00_mainContent_ibNext',
-                    '<a:has-text("Next→")',
+                    'a:has-text("Next→")',
                 ]
 
                 next_clicked = False
@@ -664,7 +1267,7 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                         if next_button:
                             print(f"✅ Found Next button: {selector}")
                             await next_button.click()
-                            await page.wait_for_load_state('networkidle')
+                            await self._wait_for_calendar_ready(page)
                             next_clicked = True
                             break
                     except Exception:
@@ -699,27 +1302,7 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             class_containers = []
             day_container_handle = None
             try:
-                day_container_handle = await day_section.evaluate_handle(
-                    """(node) => {
-                        const scopes = [
-                            '.classCalendarDay',
-                            '.classDayWrapper',
-                            '.classWeekDay',
-                            '.dayWrap',
-                            '.uk-accordion-content',
-                            '.uk-panel',
-                            '.day-wrapper',
-                            '.classDay'
-                        ];
-                        for (const selector of scopes) {
-                            const match = node.closest(selector);
-                            if (match) {
-                                return match;
-                            }
-                        }
-                        return node;
-                    }"""
-                )
+                day_container_handle = await day_section.evaluate_handle(_DAY_SCOPE_JS)
             except Exception:
                 day_container_handle = None
 
@@ -732,40 +1315,58 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 print("⚠️  Could not scope class search to day section, falling back to full page scan")
                 class_containers = await page.query_selector_all('div.classDesktopWrapper')
 
-            # Collect metadata to filter class containers down to the requested day
-            container_contexts = []
-            filtered_contexts = []
-            skipped_contexts = []
-
-            for original_index, container in enumerate(class_containers, 1):
-                matches_day, label = await self._container_matches_day(container, day_tokens)
-                context_entry = (original_index, container, label, matches_day)
-                container_contexts.append(context_entry)
-                if matches_day:
-                    filtered_contexts.append(context_entry)
-                else:
-                    skipped_contexts.append(context_entry)
+            # Classify every container in one round-trip rather than one evaluate per container,
+            # keeping only the (index, container, label) entries for the requested day
+            day_results = await self._classify_containers_by_day(page, class_containers, day_tokens)
+            filtered_contexts = [
+                (original_index, container, label)
+                for original_index, (container, (matches_day, label)) in enumerate(zip(class_containers, day_results), 1)
+                if matches_day
+            ]
 
             if filtered_contexts:
                 class_contexts = filtered_contexts
                 print(f"✅ Scoped search to {len(filtered_contexts)} class container(s) matching {day_header}")
+                # Release handles to other days' containers so the browser can collect them
+                for container, (matches_day, _) in zip(class_containers, day_results):
+                    if not matches_day:
+                        try:
+                            await container.dispose()
+                        except Exception:
+                            pass
             else:
-                class_contexts = container_contexts
-                if skipped_contexts:
+                class_contexts = [
+                    (original_index, container, label)
+                    for original_index, (container, (_, label)) in enumerate(zip(class_containers, day_results), 1)
+                ]
+                if class_containers:
                     print("⚠️  Day-level filtering did not match any containers; continuing with unfiltered list")
 
+            # Lowercase the search terms once; container text is compared case-insensitively
+            instructor_lower = instructor.lower()
+            time_variants = (time.lower(), time.replace(':', '').lower())
+
+            # Read every candidate container's text in one round-trip
+            try:
+                container_texts = await page.evaluate(
+                    "(nodes) => nodes.map((node) => node.textContent || '')",
+                    [container for _, container, _ in class_contexts]
+                )
+            except Exception as e:
+                print(f"⚠️  Could not read class containers: {e}")
+                container_texts = [''] * len(class_contexts)
+
             class_booked = False
             matching_containers = 0
-            for original_index, container, label, _ in class_contexts:
+            for (original_index, container, label), container_text in zip(class_contexts, container_texts):
                 try:
-                    # Get all text content from this class container
-                    container_text = await container.text_content()
                     if not container_text:
                         continue
                     
                     # Check if this container has both the instructor and time
-                    has_instructor = instructor in container_text
-                    has_time = time in container_text or time.replace(':', '') in container_text
+                    container_lower = container_text.lower()
+                    has_instructor = instructor_lower in container_lower
+                    has_time = any(variant in container_lower for variant in time_variants)
                     
                     if has_instructor and has_time:
                         matching_containers += 1
@@ -779,29 +1380,29 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                             print(f"⚠️  Multiple matching classes found! This is container #{matching_containers}")
                             print(f"   You may need to be more specific in your schedule (e.g., add level/type)")
                         
+                        # Tag the tile with a unique id and remember where it sits among all class
+                        # tiles, so it can be found again directly after the overlay opens
+                        booking_id = str(uuid.uuid4())
+                        try:
+                            page_index = await container.evaluate(_TAG_CONTAINER_JS, booking_id)
+                        except Exception:
+                            page_index = -1
+                        
                         # First, we need to make the overlay visible by clicking on the main class card
                         # The booking button is in the overlay which is hidden by default
                         try:
                             # Try to click on the main class card to trigger the overlay
-                            class_card_selectors = [
-                                'div.classSelectFire',
-                                'div.uk-panel-box',
-                                'div.className'
-                            ]
-                            
                             card_clicked = False
-                            for card_selector in class_card_selectors:
+                            class_card, card_selector = await self._wait_for_first(
+                                container, _CLASS_CARD_SELECTORS, timeout=1000, state='attached'
+                            )
+                            if class_card:
                                 try:
-                                    class_card = await container.query_selector(card_selector)
-                                    if class_card:
-                                        print(f"✅ Clicking class card: {card_selector}")
-                                        await class_card.click()
-                                        await page.wait_for_timeout(1000)  # Wait for overlay animation
-                                        card_clicked = True
-                                        break
+                                    print(f"✅ Clicking class card: {card_selector}")
+                                    await class_card.click()
+                                    card_clicked = True
                                 except Exception as e:
                                     print(f"⚠️  Failed to click class card {card_selector}: {e}")
-                                    continue
                             
                             if not card_clicked:
                                 print("❌ Could not click class card to open overlay")
@@ -811,23 +1412,66 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                             print(f"⚠️  Error opening class overlay: {e}")
                             continue
                         
-                        # Wait for overlay to fully load and DOM to stabilize
+                        # Wait for the overlay to show its booking button rather than sleeping
                         print("⏳ Waiting for overlay to load completely...")
-                        await page.wait_for_timeout(2000)  # Wait longer for DOM changes
+                        try:
+                            await page.wait_for_function(_BOOK_BUTTON_VISIBLE_JS, timeout=5000)
+                        except Exception:
+                            print("⚠️  No visible booking button after 5s, checking container anyway")
                         
-                        # Now look for the booking button within this specific class container
-                        # Re-find the container since DOM may have changed after clicking
-                        updated_containers = await page.query_selector_all('div.classDesktopWrapper')
+                        # Now look for the booking button within this specific class container.
+                        # The handle we clicked usually survives the overlay opening, so try it first
+                        updated_container = None
+                        booking_button = None
+                        try:
+                            booking_button = await container.wait_for_selector(
+                                'a.bookClassButton',
+                                state='visible',
+                                timeout=3000
+                            )
+                            updated_container = container
+                        except Exception:
+                            # Handle gone stale: look the tagged tile up directly by its id
+                            try:
+                                tagged_container = await page.query_selector(
+                                    f'div.classDesktopWrapper[data-booking-id="{booking_id}"]'
+                                )
+                                if tagged_container:
+                                    candidate_button = await tagged_container.query_selector('a.bookClassButton >> visible=true')
+                                    if candidate_button:
+                                        updated_container = tagged_container
+                                        booking_button = candidate_button
+                            except Exception:
+                                pass
+                            
+                            # Re-rendered without our tag: the tile at the same position is almost always ours
+                            if booking_button is None and page_index >= 0:
+                                try:
+                                    positional = await page.query_selector_all('div.classDesktopWrapper')
+                                    if page_index < len(positional):
+                                        candidate_button = await positional[page_index].query_selector('a.bookClassButton')
+                                        if candidate_button and await candidate_button.is_visible():
+                                            updated_container = positional[page_index]
+                                            booking_button = candidate_button
+                                except Exception:
+                                    pass
+                            
+                            # Otherwise re-verify by text with one evaluate over every container,
+                            # turning only the first match into a handle
+                            if booking_button is None:
+                                try:
+                                    updated_indices = await self._scan_containers(page, instructor, time)
+                                    if updated_indices:
+                                        updated_container = await page.locator('div.classDesktopWrapper').nth(updated_indices[0]).element_handle()
+                                except Exception as e:
+                                    print(f"⚠️  Error checking container: {e}")
                         
-                        for updated_container in updated_containers:
+                        if updated_container:
                             try:
-                                # Check if this is still our class
-                                container_text = await updated_container.text_content()
-                                if container_text and instructor in container_text and time in container_text:
+                                if booking_button is None:
                                     print(f"✅ Found updated container for {instructor} at {time}")
                                     
                                     # Look for booking button within this specific container
-                                    booking_button = None
                                     try:
                                         booking_button = await updated_container.wait_for_selector(
                                             'a.bookClassButton',
@@ -837,43 +1481,38 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                                     except Exception:
                                         booking_button = await updated_container.query_selector('a.bookClassButton')
 
-                                    if booking_button:
-                                        try:
-                                            await booking_button.scroll_into_view_if_needed()
-                                        except Exception:
-                                            pass
-
-                                        button_text = await booking_button.text_content()
-                                        display_text = button_text.strip() if button_text else "Unknown"
-
-                                        
-                                        # Check what type of button it is
-                                        if button_text:
-                                            button_lower = button_text.lower()
-                                            if "waiting" in button_lower:
-                                                print(f"❌ Class is full - only waiting list available")
-                                                return False
-                                            elif "full" in button_lower:
-                                                print(f"❌ Class is full")
-                                                return False
-                                            elif "book" in button_lower:
-                                                is_visible = await booking_button.is_visible()
-                                                if is_visible:
-                                                    print(f"✅ Clicking booking button for {instructor} class")
-                                                    await booking_button.click()
-                                                    await page.wait_for_load_state('networkidle')
-                                                    class_booked = True
-                                                    break
-                                                else:
-                                                    print(f"⚠️  Booking button not visible")
+                                if booking_button:
+                                    try:
+                                        await booking_button.scroll_into_view_if_needed()
+                                    except Exception:
+                                        pass
+
+                                    button_text = await booking_button.text_content()
+                                    
+                                    # Check what type of button it is
+                                    if button_text:
+                                        button_lower = button_text.lower()
+                                        if "waiting" in button_lower:
+                                            print(f"❌ Class is full - only waiting list available")
+                                            return False
+                                        elif "full" in button_lower:
+                                            print(f"❌ Class is full")
+                                            return False
+                                        elif "book" in button_lower:
+                                            is_visible = await booking_button.is_visible()
+                                            if is_visible:
+                                                print(f"✅ Clicking booking button for {instructor} class")
+                                                await booking_button.click()
+                                                await page.wait_for_load_state('domcontentloaded')
+                                                class_booked = True
                                             else:
-                                                print(f"⚠️  Unknown button type: '{button_text.strip()}'")
-                                    else:
-                                        print(f"❌ No booking button found in {instructor} class container")
-                                    break
+                                                print(f"⚠️  Booking button not visible")
+                                        else:
+                                            print(f"⚠️  Unknown button type: '{button_text.strip()}'")
+                                else:
+                                    print(f"❌ No booking button found in {instructor} class container")
                             except Exception as e:
                                 print(f"⚠️  Error checking container: {e}")
-                                continue
                         
                         if class_booked:
                             break
@@ -893,75 +1532,50 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             print("✅ Class booking clicked! Looking for confirmation...")
             
             # Accept terms if they appear
-            checkbox_selectors = [
-                'input#ctl00_mainContent_chkTerms',  # Updated to match actual HTML
-                'input#ctl00_mainContent_Terms',     # Keep old one as fallback
-                'input[type="checkbox"]'
-            ]
-            
-            for selector in checkbox_selectors:
+            checkbox, _ = await self._wait_for_first(page, _CLASS_TERMS_SELECTORS, timeout=3000)
+            if checkbox:
                 try:
-                    checkbox = await page.wait_for_selector(selector, timeout=3000)
-                    if checkbox:
-                        is_checked = await checkbox.is_checked()
-                        if not is_checked:
-                            print("✅ Checking terms and conditions...")
-                            await checkbox.check()
-                        break
-                except:
-                    continue
+                    is_checked = await checkbox.is_checked()
+                    if not is_checked:
+                        print("✅ Checking terms and conditions...")
+                        await checkbox.check()
+                except Exception:
+                    pass
             
             # Look for final confirm/book button
-            confirm_selectors = [
-                'a#ctl00_mainContent_PageNavControl_ibNext',
-                'button:has-text("Book")',
-                'button:has-text("Confirm")',
-                'input[value="Book"]',
-                'input[value="Confirm"]'
-            ]
-            
-            for selector in confirm_selectors:
+            confirm_button, selector = await self._wait_for_first(page, _CLASS_CONFIRM_SELECTORS, timeout=5000)
+            if confirm_button:
                 try:
-                    confirm_button = await page.wait_for_selector(selector, timeout=5000)
-                    if confirm_button:
-                        print(f"✅ Found confirmation button: {selector}")
-                        await confirm_button.click()
-                        await page.wait_for_load_state('networkidle')
-                        
-                        # Check for success indicators
-                        success_selectors = [
-                            'h1:has-text("Booking Complete")',
-                            '*:has-text("booked")',
-                            '*:has-text("confirmed")',
-                            '*:has-text("success")'
-                        ]
-                        
-                        success_found = False
-                        for success_selector in success_selectors:
-                            try:
-                                success_element = await page.wait_for_selector(success_selector, timeout=5000)
-                                if success_element:
-                                    success_text = await success_element.text_content()
-                                    print(f"🎉 Class booking successful! {success_text}")
-                                    success_found = True
-                                    break
-                            except:
-                                continue
-                        
-                        if success_found:
-                            return True
+                    print(f"✅ Found confirmation button: {selector}")
+                    await confirm_button.click()
+                    await page.wait_for_load_state('domcontentloaded')
+                    
+                    # Check for success indicators
+                    # Race the indicators so a miss costs one timeout rather than one per selector
+                    success_found = False
+                    success_element, _ = await self._race_selectors(page, _BOOKING_SUCCESS_SELECTORS, timeout=5000)
+                    if success_element:
+                        success_text = await success_element.text_content()
+                        print(f"🎉 Class booking successful! {success_text}")
+                        success_found = True
+                    
+                    if success_found:
+                        return True
+                    else:
+                        print(f"⚠️  No booking success confirmation found for {instructor} at {time}")
+                        # Check if we're outside booking window
+                        # Let the page search its own text rather than serialising the whole DOM
+                        unavailable = await page.locator(
+                            'body:has-text("not available"), body:has-text("fully booked")'
+                        ).count()
+                        if unavailable:
+                            print("❌ Class not available or fully booked")
+                            return False
                         else:
-                            print(f"⚠️  No booking success confirmation found for {instructor} at {time}")
-                            # Check if we're outside booking window
-                            page_content = await page.content()
-                            if "not available" in page_content.lower() or "fully booked" in page_content.lower():
-                                print("❌ Class not available or fully booked")
-                                return False
-                            else:
-                                print("❌ Booking may have failed - no success confirmation")
-                                return False
-                except:
-                    continue
+                            print("❌ Booking may have failed - no success confirmation")
+                            return False
+                except Exception as e:
+                    print(f"⚠️  Confirmation step failed for {selector}: {e}")
             
             print(f"❌ Could not find or book class: {instructor} at {time} on {target_date.strftime('%Y-%m-%d')}")
             print("   This class may not exist on this date or is outside the bookable window")
@@ -981,19 +1595,7 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         Returns:
             "morning", "afternoon", or "evening"
         """
-        try:
-            # Parse the hour from the time string
-            hour = int(specific_time.split(':')[0])
-            
-            if hour < 12:
-                return "morning"
-            elif hour < 17:
-                return "afternoon"
-            else:
-                return "evening"
-        except:
-            # If we can't parse the time, default to morning
-            return "morning"
+        return _infer_time_period_cached(specific_time)
 
     async def book_swim_lane(self, page: Page, target_date: datetime, duration: int, time: str) -> bool:
         """
@@ -1017,31 +1619,19 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             print("Looking for Swim navigation...")
             
             # First try to find a swim link on the current authenticated page
-            swim_link_selectors = [
-                'a[href="../swim/Swim.aspx"]',
-                'a[href*="Swim.aspx"]',
-                'a[href*="swim"]',
-                'a:has-text("Swim")',
-                'a:has-text("Swimming")',
-                'a:has-text("Pool")',
-                '*:has-text("Swim")',
-                '*:has-text("Pool")'
-            ]
-            
             navigated = False
-            for link_selector in swim_link_selectors:
+            print("Looking for swim link...")
+            swim_link, link_selector = await self._wait_for_first(page, _SWIM_LINK_SELECTORS, timeout=3000)
+            if swim_link:
                 try:
-                    print(f"Looking for swim link: {link_selector}")
-                    swim_link = await page.wait_for_selector(link_selector, timeout=3000)
-                    if swim_link:
-                        print(f"✅ Found swim link: {link_selector}")
-                        await swim_link.click()
-                        await page.wait_for_load_state('networkidle')
-                        navigated = True
-                        break
+                    print(f"✅ Found swim link: {link_selector}")
+                    await swim_link.click()
+                    await page.wait_for_load_state('domcontentloaded')
+                    navigated = True
                 except Exception as e:
-                    print(f"⚠️  Swim link not found: {link_selector}")
-                    continue
+                    print(f"⚠️  Swim link click failed for {link_selector}: {e}")
+            else:
+                print("⚠️  Swim link not found")
             
             # If no link found, try direct navigation (but within the same session)
             if not navigated:
@@ -1049,8 +1639,7 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 try:
                     swim_url = "https://online.thehogarth.co.uk/swim/Swim.aspx"
                     print(f"Navigating to: {swim_url}")
-                    await page.goto(swim_url, timeout=15000)
-                    await page.wait_for_load_state('networkidle', timeout=10000)
+                    await page.goto(swim_url, timeout=15000, wait_until='domcontentloaded')
                     print("✅ Direct swim navigation successful")
                     navigated = True
                 except Exception as e:
@@ -1088,15 +1677,8 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                             await page.wait_for_timeout(1000)  # Wait for datepicker to open
                             
                             # Look for datepicker calendar
-                            calendar_selectors = [
-                                '.uk-datepicker',
-                                '[data-uk-datepicker]',
-                                '.datepicker',
-                                '.uk-dropdown'
-                            ]
-                            
                             calendar_found = False
-                            for cal_selector in calendar_selectors:
+                            for cal_selector in _DATEPICKER_CALENDAR_SELECTORS:
                                 try:
                                     calendars = await page.query_selector_all(cal_selector)
                                     if calendars:
@@ -1104,17 +1686,17 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                                         calendar_found = True
                                         navigation_success = await self._navigate_datepicker_to_date(page, cal_selector, target_date)
                                         if navigation_success:
-                                            # Wait for the input value to update
-                                            last_value = current_value
-                                            for _ in range(12):
-                                                new_value = await self._get_input_value(date_input)
-                                                if new_value == target_date_str:
-                                                    print(f"✅ Date selected via datepicker: {new_value}")
-                                                    date_selected = True
-                                                    break
-                                                last_value = new_value
-                                                await page.wait_for_timeout(250)
-                                            if not date_selected:
+                                            # Let the page tell us when the input value updates
+                                            try:
+                                                await page.wait_for_function(
+                                                    "([input, target]) => input.value === target",
+                                                    arg=[date_input, target_date_str],
+                                                    timeout=3000
+                                                )
+                                                print(f"✅ Date selected via datepicker: {target_date_str}")
+                                                date_selected = True
+                                            except Exception:
+                                                last_value = await self._get_input_value(date_input)
                                                 print(f"⚠️  Datepicker navigation completed but value is '{last_value}'")
                                         else:
                                             print("⚠️  Could not navigate datepicker to target month/day")
@@ -1138,12 +1720,8 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             
             # Select duration
             print(f"Selecting duration: {duration} minutes...")
-            duration_selectors = [
-                'select#ctl00_mainContent_minutes'
-            ]
-            
             duration_selected = False
-            for selector in duration_selectors:
+            for selector in _DURATION_SELECTORS:
                 try:
                     duration_locator = page.locator(selector)
                     await duration_locator.wait_for(state="visible", timeout=3000)
@@ -1151,63 +1729,50 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                     print(f"⚠️  Duration dropdown not ready for {selector}: {e}")
                     continue
 
-                try:
-                    options = await duration_locator.evaluate(
-                        """(el) => Array.from(el.options).map(opt => ({
-                            text: (opt.textContent || '').trim(),
-                            value: (opt.value || '').trim()
-                        }))"""
-                    )
-                except Exception as e:
-                    print(f"⚠️  Could not read duration options for {selector}: {e}")
-                    continue
-
                 target_token = f"{duration} min"
-                for option in options:
-                    option_text = option.get("text", "")
-                    if not option_text:
-                        continue
-
-                    text_normalised = option_text.lower().replace("mins", "min")
-                    if target_token not in text_normalised:
-                        continue
+                option = await self._find_select_option(duration_locator, [target_token], normalise_mins=True)
+                if not option:
+                    print(f"⚠️  No {target_token} option in {selector}")
+                    continue
 
-                    option_value = option.get("value", "")
-                    print(f"✅ Selecting duration: {option_text}")
+                option_text = option["text"]
+                option_value = option["value"]
+                print(f"✅ Selecting duration: {option_text}")
 
-                    selection_applied = False
-                    # Try selecting by value first to avoid stale element handles
-                    if option_value:
-                        try:
-                            await duration_locator.select_option(value=option_value)
-                            selection_applied = True
-                        except Exception as value_err:
-                            print(f"⚠️  select_option(value=...) failed: {value_err}")
-                    if not selection_applied:
-                        try:
-                            await duration_locator.select_option(label=option_text)
-                            selection_applied = True
-                        except Exception as label_err:
-                            print(f"⚠️  select_option(label=...) failed: {label_err}")
+                selection_applied = False
+                # Try selecting by value first to avoid stale element handles
+                if option_value:
+                    try:
+                        await duration_locator.select_option(value=option_value)
+                        selection_applied = True
+                    except Exception as value_err:
+                        print(f"⚠️  select_option(value=...) failed: {value_err}")
+                if not selection_applied:
+                    try:
+                        await duration_locator.select_option(label=option_text)
+                        selection_applied = True
+                    except Exception as label_err:
+                        print(f"⚠️  select_option(label=...) failed: {label_err}")
 
-                    if not selection_applied and option_value:
-                        try:
-                            # Use page-level selection as a last resort
-                            await page.select_option(selector, option_value)
-                            selection_applied = True
-                        except Exception as page_err:
-                            print(f"⚠️  page.select_option fallback failed: {page_err}")
-
-                    if selection_applied:
-                        await page.wait_for_timeout(300)
-                        try:
-                            selected_label = (await duration_locator.evaluate("(el) => el.options[el.selectedIndex]?.textContent || ''") or '').strip()
-                        except Exception as verify_err:
-                            print(f"⚠️  Could not verify duration selection: {verify_err}")
-                            selected_label = ''
-                        if selected_label and target_token in selected_label.lower().replace("mins", "min"):
-                            duration_selected = True
-                            break
+                if not selection_applied and option_value:
+                    try:
+                        # Use page-level selection as a last resort
+                        await page.select_option(selector, option_value)
+                        selection_applied = True
+                    except Exception as page_err:
+                        print(f"⚠️  page.select_option fallback failed: {page_err}")
+
+                if selection_applied:
+                    await page.wait_for_timeout(300)
+                    # The matched option's text was already normalised in the page; just
+                    # confirm that option is the one now selected
+                    try:
+                        selected_index = await duration_locator.evaluate("(el) => el.selectedIndex")
+                    except Exception as verify_err:
+                        print(f"⚠️  Could not verify duration selection: {verify_err}")
+                        selected_index = None
+                    if selected_index == option["index"]:
+                        duration_selected = True
 
                 if duration_selected:
                     break
@@ -1217,37 +1782,19 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             
             # Select time period first (morning/afternoon/evening)
             print(f"Selecting time period: {time_period}...")
-            time_period_selectors = [
-                '#ctl00_mainContent_timeOfDay',
-            ]
-            
-            time_period_keywords = {
-                "morning": ["Morning (Before 12:00)"],
-                "afternoon": ["Afternoon (12:00 - 17:00)"],  # Fixed: added spaces around hyphen
-                "evening": ["Evening (After 17:00)"]
-            }
-            
             period_selected = False
-            for selector in time_period_selectors:
+            period_select, _ = await self._wait_for_first(page, _TIME_PERIOD_SELECTORS, timeout=3000)
+            if period_select:
                 try:
-                    period_select = await page.wait_for_selector(selector, timeout=3000)
-                    if period_select:
-                        options = await page.query_selector_all(f'{selector} option')
-                        for option in options:
-                            option_text = await option.text_content()
-                            option_value = await option.get_attribute('value')
-                            
-                            # Check if this option matches our time period
-                            if option_text and any(keyword in option_text for keyword in time_period_keywords.get(time_period, [])):
-                                print(f"✅ Selecting time period: {option_text}")
-                                await period_select.select_option(value=option_value)
-                                await page.wait_for_timeout(1000)  # Wait for onchange event
-                                period_selected = True
-                                break
-                        if period_selected:
-                            break
-                except:
-                    continue
+                    # Match against our time period's keywords inside the page
+                    option = await self._find_select_option(period_select, list(_TIME_PERIOD_KEYWORDS.get(time_period, ())))
+                    if option:
+                        print(f"✅ Selecting time period: {option['text']}")
+                        await period_select.select_option(value=option['value'])
+                        await page.wait_for_timeout(1000)  # Wait for onchange event
+                        period_selected = True
+                except Exception:
+                    pass
             
             if not period_selected:
                 print(f"⚠️  Could not select time period '{time_period}'")
@@ -1259,29 +1806,21 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 return False
                 
             print("Both dropdowns selected, looking for Go button...")
-            await page.wait_for_timeout(1000)  # Give time for Go button to appear
-            
-            go_selectors = [
-                'a#ctl00_mainContent_goBtn',
-                'button:has-text("Go")',
-                'input[value="Go"]',
-                '.goBtn'
-            ]
+            try:
+                await page.wait_for_selector('a#ctl00_mainContent_goBtn:not([disabled])', timeout=5000)
+            except Exception:
+                pass  # Fall through to the selector list below
             
             go_clicked = False
-            for selector in go_selectors:
+            go_button, selector = await self._wait_for_first(page, _GO_SELECTORS, timeout=5000)
+            if go_button:
                 try:
-                    go_button = await page.wait_for_selector(selector, timeout=5000)
-                    if go_button:
-                        print(f"✅ Found Go button: {selector}")
-                        await go_button.click()
-                        await page.wait_for_load_state('networkidle', timeout=15000)
-                        await page.wait_for_timeout(3000)  # Extra time for time slots to load
-                        go_clicked = True
-                        break
+                    print(f"✅ Found Go button: {selector}")
+                    await go_button.click()
+                    await page.wait_for_load_state('domcontentloaded')
+                    go_clicked = True
                 except Exception as e:
                     print(f"⚠️  Go button click failed for {selector}: {e}")
-                    continue
             
             if not go_clicked:
                 print("❌ Could not find or click Go button after dropdown selections")
@@ -1290,105 +1829,66 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             # Step 4: Look for available time slots in preferred lanes (2, 3, then 1, 4)
             print(f"Looking for {time} time slot in preferred lanes...")
             
-            # Wait for time slots to fully load - they may load dynamically
+            # Wait for the timeSlots containers to be marked 'loaded' with slots inside them;
+            # returns as soon as they render instead of sleeping for a fixed worst case
             print("⏳ Waiting for time slots to load...")
-            await page.wait_for_timeout(5000)  # Increased: Wait 5 seconds for dynamic loading
-            
-            # Wait for the timeSlots containers to have the 'loaded' class
             try:
-                await page.wait_for_selector('.timeSlots.loaded', timeout=12000)  # Increased: 12 seconds
+                await page.wait_for_function(_TIME_SLOTS_LOADED_JS, timeout=15000)
                 print("✅ Time slots marked as loaded")
-            except:
-                print("⚠️  Time slots 'loaded' class not found, waiting additional time...")
-                # If 'loaded' class not found, wait longer before continuing
-                await page.wait_for_timeout(5000)  # Increased: 5 more seconds
-                
-            # Additional wait for CSS transitions and final rendering
-            await page.wait_for_timeout(3000)  # Increased: 3 seconds for transitions
+            except Exception:
+                print("⚠️  Time slots not marked as loaded after 15s, scanning lanes anyway")
             
             # Priority order: Lane 2, Lane 3, Lane 4, Lane 1
             lane_priority = [2, 3, 4, 1]
             slot_booked = False
             
+            # Lanes render one by one after 'loaded' is set; re-scan briefly for the preferred
+            # lane so a slower lane 2 isn't passed over for a fallback that rendered first
+            try:
+                await page.wait_for_function(
+                    _LANE_SLOT_FOUND_JS,
+                    arg={'priority': lane_priority[:1], 'time': time},
+                    polling=250,
+                    timeout=3000
+                )
+            except Exception:
+                print(f"⚠️  No {time} slot in Lane {lane_priority[0]} after 3s, checking fallback lanes")
 
-            # Get lane containers for booking
-            time_slot_inners = await page.query_selector_all('div.timeSlotInner')
+            # Search every lane in priority order inside the page; one round-trip
+            try:
+                slot = await page.evaluate(_FIND_LANE_SLOT_JS, {'priority': lane_priority, 'time': time})
+            except Exception as e:
+                print(f"⚠️  Could not read lane time slots: {e}")
+                slot = None
             
-            for lane_num in lane_priority:
-                if slot_booked:
-                    break
-                    
-                print(f"Checking Lane {lane_num} for {time}...")
-                
-                if len(time_slot_inners) >= lane_num:
-                    # Get the timeSlotInner for this specific lane (0-indexed)
-                    lane_div = time_slot_inners[lane_num - 1]
-                    print(f"✅ Found Lane {lane_num} container")
-                    
-                    # Find all timeSlot divs within this lane
-                    time_slots = await lane_div.query_selector_all('div.timeSlot')
-                    
-                    # Always try the booking button approach as it seems more reliable
-                    booking_buttons = await lane_div.query_selector_all('a.bookButton')
-                    # Use booking buttons approach if we have them
-                    if len(booking_buttons) > 0:
-                        for button in booking_buttons:
-                            try:
-                                # Get the button text content directly
-                                link_text = await button.text_content()
-                                
-                                # Extract time pattern
-                                if not link_text:
-                                    continue
-                                clean_text = re.sub(r'\s+', ' ', link_text).strip()
-                                time_match_obj = re.search(r'\b(\d{1,2}:\d{2})\b', clean_text)
-                                
-                                if time_match_obj:
-                                    extracted_time = time_match_obj.group(1)
-                                    
-                                    if extracted_time == time:
-                                        print(f"✅ Found {time} slot in Lane {lane_num}")
-                                        await button.click()
-                                        slot_booked = True
-                                        break
-                            except Exception as e:
-                                print(f"⚠️  Error checking button: {e}")
-                                continue
-                                
-                        if slot_booked:
-                            break
-                            
-                    if not slot_booked:
-                        print(f"⚠️  No {time} slot available in Lane {lane_num}")
-                else:
-                    print(f"⚠️  Could not find Lane {lane_num} div")
+            if slot and slot.get('lane'):
+                lane_num = slot['lane']
+                print(f"✅ Found {time} slot in Lane {lane_num}")
+                try:
+                    # Only the chosen slot is located again, for the click
+                    await page.locator('div.timeSlotInner').nth(lane_num - 1).locator('a.bookButton').nth(slot['index']).click()
+                    slot_booked = True
+                except Exception as e:
+                    print(f"⚠️  Error clicking {time} slot in Lane {lane_num}: {e}")
+            elif slot:
+                print(f"⚠️  No {time} slot available in {slot['laneCount']} lane(s) checked")
             
             if not slot_booked:
                 print(f"❌ Could not find {time} slot in any lane")
                 return False
             
             # Step 5: Click "Next" button after selecting time slot
+            # No fixed pause: the Next wait below returns as soon as the button appears
             print("✅ Time slot selected! Looking for Next button...")
-            await page.wait_for_timeout(2000)
-            
-            next_selectors = [
-                'button:has-text("Next")',
-                'input[value="Next"]',
-                'a:has-text("Next")',
-                '*:has-text("Next")'
-            ]
-            
             next_clicked = False
-            for selector in next_selectors:
+            next_button, next_selector = await self._wait_for_first(page, _SWIM_NEXT_SELECTORS, timeout=5000)
+            if next_button:
                 try:
-                    next_button = await page.wait_for_selector(selector, timeout=5000)
-                    if next_button:
-                        print(f"✅ Found Next button: {selector}")
-                        await next_button.click()
-                        next_clicked = True
-                        break
-                except:
-                    continue
+                    print(f"✅ Found Next button: {next_selector}")
+                    await next_button.click()
+                    next_clicked = True
+                except PlaywrightError as e:
+                    print(f"⚠️  Next button click failed for {next_selector}: {e}")
             
             if not next_clicked:
                 print("❌ Could not find Next button")
@@ -1396,26 +1896,19 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             
             # Step 6: Accept terms and conditions
             print("✅ Next clicked! Looking for terms and conditions...")
-            await page.wait_for_load_state('networkidle')
-            
-            checkbox_selectors = [
-                'input#ctl00_mainContent_chkTerms',  # Updated to match actual HTML
-                'input#ctl00_mainContent_Terms',     # Keep old one as fallback
-            ]
+            await page.wait_for_load_state('domcontentloaded')
             
             checkbox_found = False
-            for selector in checkbox_selectors:
+            checkbox, _ = await self._wait_for_first(page, _SWIM_TERMS_SELECTORS, timeout=5000)
+            if checkbox:
                 try:
-                    checkbox = await page.wait_for_selector(selector, timeout=5000)
-                    if checkbox:
-                        is_checked = await checkbox.is_checked()
-                        if not is_checked:
-                            print("✅ Checking terms and conditions...")
-                            await checkbox.check()
-                        checkbox_found = True
-                        break
-                except:
-                    continue
+                    is_checked = await checkbox.is_checked()
+                    if not is_checked:
+                        print("✅ Checking terms and conditions...")
+                        await checkbox.check()
+                    checkbox_found = True
+                except Exception:
+                    pass
             
             if not checkbox_found:
                 print("⚠️  Could not find terms and conditions checkbox")
@@ -1432,28 +1925,18 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                     if book_button:
                         print(f"✅ Found final Book button: {selector}")
                         await book_button.click()
-                        await page.wait_for_load_state('networkidle')
+                        await page.wait_for_load_state('domcontentloaded')
                         
                         # Check for success
-                        success_selectors = [
-                            'h1:has-text("Booking Complete")',
-                            '*:has-text("booked")',
-                            '*:has-text("confirmed")',
-                            '*:has-text("success")'
-                        ]
-                        
-                        for success_selector in success_selectors:
-                            try:
-                                success_element = await page.wait_for_selector(success_selector, timeout=5000)
-                                if success_element:
-                                    print(f"🎉 Swim lane booking successful!")
-                                    return True
-                            except:
-                                continue
+                        # Race the indicators so a miss costs one timeout rather than one per selector
+                        success_element, _ = await self._race_selectors(page, _BOOKING_SUCCESS_SELECTORS, timeout=5000)
+                        if success_element:
+                            print(f"🎉 Swim lane booking successful!")
+                            return True
                         
                         print("✅ Final Book button clicked - likely successful")
                         return True
-                except:
+                except (PlaywrightError, asyncio.TimeoutError):
                     continue
             
             print("❌ Could not find final Book button")
@@ -1473,36 +1956,51 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         # Get S3 configuration (required)
         s3_bucket = os.getenv('SCHEDULE_S3_BUCKET')
         s3_key = os.getenv('SCHEDULE_S3_KEY', 'schedule.csv')
+        s3_key_backup = os.getenv('SCHEDULE_S3_KEY_BACKUP')
         
         if not s3_bucket:
             raise ValueError("SCHEDULE_S3_BUCKET environment variable is required")
         
         print(f"Loading schedule from S3: s3://{s3_bucket}/{s3_key}")
-        return await self._load_schedule_from_s3(s3_bucket, s3_key)
+        return await self._load_schedule_from_s3(s3_bucket, s3_key, s3_key_backup)
 
-    async def _load_schedule_from_s3(self, s3_bucket: str, s3_key: str) -> list:
+    async def _load_schedule_from_s3(self, s3_bucket: str, s3_key: str, s3_key_backup: Optional[str] = None) -> list:
         """
         Load schedule from S3 bucket
         
         Args:
             s3_bucket: S3 bucket name
             s3_key: S3 object key (file path)
+            s3_key_backup: Optional second key to read if the primary can't be fetched
             
         Returns:
             List of schedule entries
         """
         try:
-            import boto3
-            s3_client = boto3.client('s3')
-            
-            # Download schedule from S3
-            response = s3_client.get_object(Bucket=s3_bucket, Key=s3_key)
-            schedule_content = response['Body'].read().decode('utf-8')
+            from botocore.exceptions import ClientError
+            s3_client = _get_s3_client()
             
-            print(f"Successfully downloaded schedule from s3://{s3_bucket}/{s3_key}")
-            
-            # Parse CSV content
-            return self._parse_schedule_content(schedule_content)
+            # Download schedule from S3 in a worker thread so the event loop isn't blocked
+            try:
+                response = await asyncio.to_thread(s3_client.get_object, Bucket=s3_bucket, Key=s3_key)
+            except ClientError as e:
+                if not s3_key_backup:
+                    raise
+                # A missing or not-yet-visible primary shouldn't cost the whole booking window
+                print(f"⚠️  Could not fetch s3://{s3_bucket}/{s3_key} ({e}), trying backup key {s3_key_backup}")
+                s3_key = s3_key_backup
+                response = await asyncio.to_thread(s3_client.get_object, Bucket=s3_bucket, Key=s3_key)
+            body = response['Body']
+            
+            print(f"Successfully opened schedule at s3://{s3_bucket}/{s3_key}")
+            
+            # Decode and parse the body line by line as it streams in, rather than
+            # holding the raw bytes and the decoded text in memory at once
+            try:
+                lines = codecs.getreader('utf-8')(body)
+                return await asyncio.to_thread(self._parse_schedule_lines, lines)
+            finally:
+                body.close()
             
         except ImportError:
             print("Error: boto3 package required for S3 schedule loading. Install with: pip install boto3")
@@ -1521,80 +2019,114 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         Returns:
             List of schedule entries
         """
-        import csv
         from io import StringIO
         
-        schedule = []
+        return self._parse_schedule_lines(StringIO(content))
+
+    def _parse_schedule_lines(self, lines: Iterable[str]) -> list:
+        """
+        Parse schedule content from an iterable of CSV lines
+        
+        Args:
+            lines: CSV lines, e.g. a text stream; read once, one line at a time
+            
+        Returns:
+            List of schedule entries
+        """
+        import csv
         
+        schedule = []
+        row_messages = []
+        # First row seen for each (user, instructor, day, hour, minute); repeats would book twice
+        seen_bookings = {}
+
         try:
-            # Skip comment lines and empty lines
-            lines = []
-            for line in content.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    lines.append(line)
-            
-            if not lines:
+            # Stream the CSV, skipping comment lines and empty lines as they are read
+            csv_reader = csv.reader(
+                line for line in lines
+                if line.strip() and not line.lstrip().startswith('#')
+            )
+
+            header = next(csv_reader, None)
+            if header is None:
                 print("Schedule content is empty or contains only comments")
                 return []
-            
-            # Parse CSV from the cleaned lines
-            csv_reader = csv.DictReader(lines)
+
+            # Resolve column positions once rather than building a dict per row
+            header = [column.strip() for column in header]
+            columns = {}
+            for column in ('user', 'instructor', 'day_of_week', 'time'):
+                if column not in header:
+                    print(f"Schedule header is missing required column '{column}'")
+                    return []
+                columns[column] = header.index(column)
+            user_i = columns['user']
+            instructor_i = columns['instructor']
+            day_i = columns['day_of_week']
+            time_i = columns['time']
+
             for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 because of header
                 try:
-                    # Clean up the row data
-                    user = row.get('user', '').strip().lower()
-                    instructor = row.get('instructor', '').strip()
-                    day_of_week = row.get('day_of_week', '').strip().lower()
-                    time = row.get('time', '').strip()
+                    # Clean up the row data (short rows leave trailing fields empty)
+                    row_len = len(row)
+                    user = row[user_i].strip().lower() if user_i < row_len else ''
+                    instructor = row[instructor_i].strip() if instructor_i < row_len else ''
+                    day_of_week = row[day_i].strip().lower() if day_i < row_len else ''
+                    time = row[time_i].strip() if time_i < row_len else ''
                     
                     # Validate required fields
                     if not all([user, instructor, day_of_week, time]):
-                        print(f"Skipping incomplete row {row_num}: {row}")
+                        row_messages.append(f"Skipping incomplete row {row_num}: {row}")
                         continue
                     
                     # Validate user
-                    if user not in ['peter', 'adrienne', 'lucy']:
-                        print(f"Skipping row {row_num}: Invalid user '{user}' (must be peter, adrienne, or lucy)")
+                    if user not in _VALID_USERS:
+                        row_messages.append(f"Skipping row {row_num}: Invalid user '{user}' (must be peter, adrienne, or lucy)")
                         continue
                     
                     # Validate day of week
-                    valid_days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-                    if day_of_week not in valid_days:
-                        print(f"Skipping row {row_num}: Invalid day_of_week '{day_of_week}' (must be monday-sunday)")
+                    if day_of_week not in _VALID_DAYS:
+                        row_messages.append(f"Skipping row {row_num}: Invalid day_of_week '{day_of_week}' (must be monday-sunday)")
                         continue
                     
                     # Validate time format
-                    try:
-                        time_parts = time.split(':')
-                        if len(time_parts) != 2:
-                            raise ValueError("Invalid format")
-                        hour, minute = int(time_parts[0]), int(time_parts[1])
-                        if not (0 <= hour <= 23 and 0 <= minute <= 59):
-                            raise ValueError("Invalid time range")
-                        # Check if time is on quarter hour
-                        if minute not in [0, 15, 30, 45]:
-                            print(f"Warning row {row_num}: Time '{time}' is not on quarter hour (00, 15, 30, 45)")
-                    except ValueError:
-                        print(f"Skipping row {row_num}: Invalid time format '{time}' (must be HH:MM)")
+                    time_match = _TIME_RE.match(time)
+                    if not time_match:
+                        row_messages.append(f"Skipping row {row_num}: Invalid time format '{time}' (must be HH:MM)")
+                        continue
+                    hour, minute = int(time_match.group(1)), int(time_match.group(2))
+                    # Check if time is on quarter hour
+                    if minute not in _VALID_MINUTES:
+                        row_messages.append(f"Warning row {row_num}: Time '{time}' is not on quarter hour (00, 15, 30, 45)")
+                    
+                    booking_key = (user, instructor.lower(), day_of_week, hour, minute)
+                    if booking_key in seen_bookings:
+                        row_messages.append(f"Skipping row {row_num}: Duplicate of row {seen_bookings[booking_key]}")
                         continue
+                    seen_bookings[booking_key] = row_num
                     
                     schedule.append({
                         'user': user,
                         'instructor': instructor,
                         'day_of_week': day_of_week,
                         'time': time,
+                        'hour': hour,
+                        'minute': minute,
                         'row_num': row_num
                     })
                     
                 except Exception as e:
-                    print(f"Error processing row {row_num}: {e}")
+                    row_messages.append(f"Error processing row {row_num}: {e}")
                     continue
                     
         except Exception as e:
             print(f"Error parsing schedule content: {e}")
             return []
         
+        # Report skipped rows and warnings in one write rather than one per row
+        if row_messages:
+            print("\n".join(row_messages))
+        
         print(f"Loaded {len(schedule)} valid schedule entries")
         return schedule
 
@@ -1615,35 +2147,69 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         target_datetime = datetime.combine(target_date_obj, datetime.min.time()).replace(tzinfo=current_time.tzinfo)
         
         # Check if target date matches the scheduled day of week
-        day_names = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        target_day_name = day_names[target_date_obj.weekday()]
+        target_day_name = _DAY_NAMES[target_date_obj.weekday()]
         
         if target_day_name != schedule_entry['day_of_week']:
             return False, target_datetime
         
-        # Parse scheduled time
-        scheduled_time_parts = schedule_entry['time'].split(':')
-        scheduled_hour = int(scheduled_time_parts[0])
-        scheduled_minute = int(scheduled_time_parts[1])
-        
-        # Check if current time has reached the scheduled time for booking
-        current_time = current_time.replace(second=0, microsecond=0)  # Remove seconds/microseconds
-        scheduled_time = current_time.replace(hour=scheduled_hour, minute=scheduled_minute)
+        # Check if current time has reached the scheduled time for booking, comparing
+        # minutes since midnight (hour/minute are parsed once when the schedule is loaded)
+        current_minutes = current_time.hour * 60 + current_time.minute
+        scheduled_minutes = schedule_entry['hour'] * 60 + schedule_entry['minute']
+        minutes_passed = current_minutes - scheduled_minutes
         
         # Should book if current time >= scheduled time and within the same 15-minute window
-        if current_time >= scheduled_time:
+        if minutes_passed >= 0:
             # Check we're still in the same 15-minute window (to avoid re-booking)
-            minutes_passed = (current_time - scheduled_time).total_seconds() / 60
             if minutes_passed < 15:  # Within 15 minutes of booking time
                 return True, target_datetime
             else:
                 print(f"  ❌ Booking window closed (>15 minutes ago)")
         else:
-            time_until = (scheduled_time - current_time).total_seconds() / 60
-            print(f"  ⏳ Time until booking: {time_until:.1f} minutes")
+            print(f"  ⏳ Time until booking: {-minutes_passed:.1f} minutes")
         
         return False, target_datetime
 
+    def _build_schedule_index(self, schedule: list) -> dict:
+        """
+        Bucket schedule entries by day of week, hour and quarter hour
+        
+        Args:
+            schedule: List of parsed schedule entries
+            
+        Returns:
+            Dict mapping (day_of_week, hour, quarter) to the entries in that bucket
+        """
+        schedule_index = defaultdict(list)
+        for entry in schedule:
+            schedule_index[(entry['day_of_week'], entry['hour'], entry['minute'] // 15)].append(entry)
+        return schedule_index
+
+    def _candidate_entries(self, schedule_index: dict, current_time: datetime) -> list:
+        """
+        Look up the schedule entries whose booking window could be open now
+        
+        A booking window runs for 15 minutes from the scheduled time, so an entry
+        can only be due if it sits in the current quarter-hour bucket or the one
+        before it. Callers still confirm each candidate with _is_booking_time.
+        
+        Args:
+            schedule_index: Index built by _build_schedule_index
+            current_time: Current datetime (timezone-aware UK time)
+            
+        Returns:
+            List of candidate schedule entries
+        """
+        target_day_name = _DAY_NAMES[(current_time.date() + timedelta(days=8)).weekday()]
+        hour, quarter = current_time.hour, current_time.minute // 15
+        
+        candidates = list(schedule_index.get((target_day_name, hour, quarter), []))
+        if quarter > 0:
+            candidates.extend(schedule_index.get((target_day_name, hour, quarter - 1), []))
+        elif hour > 0:
+            candidates.extend(schedule_index.get((target_day_name, hour - 1, 3), []))
+        return candidates
+
     def _parse_swim_instructor(self, instructor: str) -> tuple[bool, int]:
         """
         Parse instructor string to determine if it's a swim booking and extract duration
@@ -1654,32 +2220,125 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         Returns:
             Tuple of (is_swim: bool, duration: int)
         """
-        import re
-        
-        if not instructor.lower().startswith('swim'):
-            return False, 0
-        
-        # Extract duration from "Swim(30)" format
-        match = re.search(r'swim\((\d+)\)', instructor.lower())
-        if match:
-            duration = int(match.group(1))
-            if duration in [15, 30]:
-                return True, duration
+        # Instructors repeat across the schedule, so the parse is memoised at module level
+        parsed = _parse_swim_instructor_cached(instructor)
+        if parsed is not None:
+            return parsed
         
         print(f"Invalid swim format '{instructor}' - should be 'Swim(15)' or 'Swim(30)'")
         return False, 0
 
+    def _booking_details(self, entry: dict, target_date: datetime, is_swim: bool, duration: int) -> dict:
+        """Build the booking details used in failure notification emails"""
+        return {
+            'user': entry['user'],
+            'instructor': entry['instructor'],
+            'time': entry['time'],
+            'target_date': target_date.strftime('%Y-%m-%d (%A)'),
+            'is_swim': is_swim,
+            'duration': duration if is_swim else None
+        }
+
+    async def _run_booking_flow(self, user_bot: "GymBookingBot", page: Page, entry: dict,
+                                target_date: datetime, is_swim: bool,
+                                duration: int) -> Optional[Tuple[str, str]]:
+        """
+        Log in and make a single scheduled booking
+        
+        Args:
+            user_bot: Bot holding the credentials for the entry's user
+            page: Playwright page object
+            entry: Schedule entry being booked
+            target_date: Date to book for
+            is_swim: Whether this is a swim lane booking
+            duration: Swim duration in minutes (ignored for classes)
+            
+        Returns:
+            None if booking successful, otherwise (failure reason, error details) for the email
+        """
+        # Login
+        if not await user_bot.login(page, prefetch_calendar=not is_swim):
+            print(f"❌ Login failed for {entry['user']}")
+            return ("Login Authentication Failed",
+                    "Could not log into the gym website with provided credentials")
+        
+        if is_swim:
+            # Make swim booking
+            if not await user_bot.book_swim_lane(page, target_date, duration, entry['time']):
+                return ("Swim Lane Booking Failed",
+                        "Could not secure swim lane - may be fully booked or page loading issues")
+        else:
+            # Make class booking
+            if not await user_bot.book_class(page, target_date, entry['instructor'], entry['time']):
+                return ("Class Booking Failed",
+                        f"Could not book {entry['instructor']} class - may be full, cancelled, or not available on this date")
+        
+        return None
+
+    async def _process_scheduled_entry(self, user_bot: "GymBookingBot", entry: dict, target_date: datetime) -> str:
+        """
+        Make one due booking in its own browser context on the user's shared browser
+        
+        Args:
+            user_bot: Bot for the entry's user, created with the shared browser
+            entry: Schedule entry being booked
+            target_date: Date to book for
+            
+        Returns:
+            Outcome label: "booked", "failed", "timed out" or "error"
+        """
+        print(f"🎯 Booking due: {entry['user']} - {entry['instructor']} on {target_date.strftime('%A, %Y-%m-%d')} at {entry['time']}")
+        
+        # Determine if this is a swim or class booking
+        is_swim, duration = self._parse_swim_instructor(entry['instructor'])
+        
+        context = None
+        page = None
+        failure = None
+        try:
+            context = await user_bot.new_context()
+            page = await context.new_page()
+            
+            failure = await asyncio.wait_for(
+                self._run_booking_flow(user_bot, page, entry, target_date, is_swim, duration),
+                timeout=_BOOKING_TIMEOUT_SECONDS
+            )
+            outcome = "failed" if failure else "booked"
+            
+        except asyncio.TimeoutError:
+            print(f"❌ Booking timed out after {_BOOKING_TIMEOUT_SECONDS}s for {entry['user']}")
+            failure = ("Booking Timed Out",
+                       f"Booking process did not finish within {_BOOKING_TIMEOUT_SECONDS} seconds")
+            outcome = "timed out"
+        except Exception as e:
+            print(f"❌ Error processing booking for {entry['user']}: {e}")
+            failure = ("Booking System Error",
+                       f"Unexpected error during booking process: {str(e)}")
+            outcome = "error"
+        finally:
+            if page is not None:
+                user_bot.cancel_calendar_prefetch(page)
+            if context:
+                await context.close()
+        
+        if failure:
+            # Exactly one email per entry, sent outside wait_for so a timeout can't
+            # cancel the await while the SMTP thread carries on and sends anyway
+            failure_reason, error_details = failure
+            await asyncio.to_thread(
+                self._send_booking_failure_email,
+                self._booking_details(entry, target_date, is_swim, duration),
+                failure_reason,
+                error_details
+            )
+        return outcome
+
     async def run_scheduled_bookings(self):
         """
         Process the schedule from S3 and make any bookings that are due
         """        
         # Use UK timezone (handles BST automatically)
-        if pytz:
-            uk_tz = pytz.timezone('Europe/London')
-            current_time = datetime.now(uk_tz)
-        else:
-            # Fallback to system timezone if pytz not available
-            current_time = datetime.now()
+        current_time = datetime.now(_UK_TZ)
         
         print(f"🔍 Checking schedule at {current_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
         
@@ -1689,127 +2348,74 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             print("No valid schedule entries found. Exiting gracefully.")
             return True
         
-        bookings_made = 0
+        # Only entries bucketed in the current or previous quarter hour can be due
+        schedule_index = self._build_schedule_index(schedule)
+        candidates = self._candidate_entries(schedule_index, current_time)
+        if not candidates:
+            print("No bookings due in this window. Exiting gracefully.")
+            return True
+        
+        # Check which candidates are actually due before starting a browser
+        due_bookings = []
+        for entry in candidates:
+            should_book, target_date = self._is_booking_time(entry, current_time)
+            if should_book:
+                due_bookings.append((entry, target_date))
         
-        # Process each schedule entry
-        for entry in schedule:
+        if not due_bookings:
+            print("No bookings due in this window. Exiting gracefully.")
+            return True
+        
+        booking_results = []
+        
+        # Bound how many contexts are open at once so a busy quarter hour can't exhaust memory
+        try:
+            max_concurrent = max(1, int(os.getenv('MAX_CONCURRENT_BOOKINGS', _DEFAULT_MAX_CONCURRENT_BOOKINGS)))
+        except ValueError:
+            print(f"⚠️  Invalid MAX_CONCURRENT_BOOKINGS, using {_DEFAULT_MAX_CONCURRENT_BOOKINGS}")
+            max_concurrent = _DEFAULT_MAX_CONCURRENT_BOOKINGS
+        booking_slots = asyncio.Semaphore(max_concurrent)
+        
+        async def process_limited(user_bot: GymBookingBot, entry: dict, target_date: datetime) -> str:
+            # Queue time doesn't count against the per-booking timeout
+            async with booking_slots:
+                return await self._process_scheduled_entry(user_bot, entry, target_date)
+        
+        async with async_playwright() as p:
+            # One browser for the whole run; each booking gets its own isolated context
+            is_local, browser_path = self._detect_browser_environment()
+            browser = await GymBookingBot.shared_browser(
+                p, headless=self.headless, executable_path=browser_path if is_local else None
+            )
+            
             try:
-                # Check if it's time to make this booking
-                should_book, target_date = self._is_booking_time(entry, current_time)
-                
-                if not should_book:
-                    continue
-                
-                print(f"🎯 Booking due: {entry['user']} - {entry['instructor']} on {target_date.strftime('%A, %Y-%m-%d')} at {entry['time']}")
-                
-                # Determine if this is a swim or class booking
-                is_swim, duration = self._parse_swim_instructor(entry['instructor'])
-                
-                # Create bot instance for the specific user
-                user_bot = GymBookingBot(user_name=entry['user'])
-                
-                success = False
-                async with async_playwright() as p:
-                    # Use centralized browser detection
-                    is_local, browser_path = user_bot._detect_browser_environment()
-                    
-                    if is_local and browser_path:
-                        browser = await p.chromium.launch(
-                            headless=self.headless,
-                            executable_path=browser_path
-                        )
-                    else:
-                        browser = await p.chromium.launch(headless=self.headless)
-                    
-                    # Create context with realistic user agent to avoid bot detection
-                    context = await browser.new_context(
-                        user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36'
-                    )
-                    page = await context.new_page()
-                    
+                # One bot per user, sharing the browser
+                user_bots = {}
+                bookings = []
+                for entry, target_date in due_bookings:
                     try:
-                        # Login
-                        if not await user_bot.login(page):
-                            print(f"❌ Login failed for {entry['user']}")
-                            # Send email notification for login failure
-                            self._send_booking_failure_email(
-                                {
-                                    'user': entry['user'],
-                                    'instructor': entry['instructor'],
-                                    'time': entry['time'],
-                                    'target_date': target_date.strftime('%Y-%m-%d (%A)'),
-                                    'is_swim': is_swim,
-                                    'duration': duration if is_swim else None
-                                },
-                                "Login Authentication Failed",
-                                "Could not log into the gym website with provided credentials"
-                            )
-                            continue
-                        
-                        if is_swim:
-                            # Make swim booking
-                            success = await user_bot.book_swim_lane(page, target_date, duration, entry['time'])
-                            if success:
-                                print(f"🏊 Swim booking successful: {entry['user']} - {duration}min at {entry['time']}")
-                                bookings_made += 1
-                            else:
-                                print(f"❌ Swim booking failed: {entry['user']} - {duration}min at {entry['time']}")
-                                # Send email notification for swim booking failure
-                                self._send_booking_failure_email(
-                                    {
-                                        'user': entry['user'],
-                                        'instructor': entry['instructor'],
-                                        'time': entry['time'],
-                                        'target_date': target_date.strftime('%Y-%m-%d (%A)'),
-                                        'is_swim': True,
-                                        'duration': duration
-                                    },
-                                    "Swim Lane Booking Failed",
-                                    "Could not secure swim lane - may be fully booked or page loading issues"
-                                )
-                        else:
-                            # Make class booking
-                            success = await user_bot.book_class(page, target_date, entry['instructor'], entry['time'])
-                            if success:
-                                print(f"🏃 Class booking successful: {entry['user']} - {entry['instructor']} at {entry['time']}")
-                                bookings_made += 1
-                            else:
-                                print(f"❌ Class booking failed: {entry['user']} - {entry['instructor']} at {entry['time']}")
-                                # Send email notification for class booking failure
-                                self._send_booking_failure_email(
-                                    {
-                                        'user': entry['user'],
-                                        'instructor': entry['instructor'],
-                                        'time': entry['time'],
-                                        'target_date': target_date.strftime('%Y-%m-%d (%A)'),
-                                        'is_swim': False,
-                                        'duration': None
-                                    },
-                                    "Class Booking Failed",
-                                    f"Could not book {entry['instructor']} class - may be full, cancelled, or not available on this date"
-                                )
-                        
+                        user_bot = user_bots.get(entry['user'])
+                        if user_bot is None:
+                            user_bot = user_bots[entry['user']] = GymBookingBot(user_name=entry['user'], browser=browser)
                     except Exception as e:
-                        print(f"❌ Error processing booking for {entry['user']}: {e}")
-                        # Send email notification for unexpected errors
-                        self._send_booking_failure_email(
-                            {
-                                'user': entry['user'],
-                                'instructor': entry['instructor'],
-                                'time': entry['time'],
-                                'target_date': target_date.strftime('%Y-%m-%d (%A)'),
-                                'is_swim': is_swim,
-                                'duration': duration if is_swim else None
-                            },
-                            "Booking System Error",
-                            f"Unexpected error during booking process: {str(e)}"
-                        )
-                    finally:
-                        await browser.close()
+                        print(f"❌ Error processing schedule entry {entry}: {e}")
+                        booking_results.append((entry, "error"))
+                        continue
+                    bookings.append((entry, process_limited(user_bot, entry, target_date)))
                 
-            except Exception as e:
-                print(f"❌ Error processing schedule entry {entry}: {e}")
-                continue
+                # Run the due bookings concurrently, at most max_concurrent at a time
+                outcomes = await asyncio.gather(*(booking for _, booking in bookings))
+                booking_results.extend(zip((entry for entry, _ in bookings), outcomes))
+            finally:
+                await GymBookingBot.close_shared_browser()
+                GymBookingBot.close_smtp()
+        
+        bookings_made = sum(1 for _, outcome in booking_results if outcome == "booked")
         
-        print(f"✅ Schedule processing complete. Bookings made: {bookings_made}")
+        # One summary record for the whole run instead of a status line per booking
+        summary_lines = [f"✅ Schedule processing complete. Bookings made: {bookings_made}"]
+        for entry, outcome in booking_results:
+            icon = "✅" if outcome == "booked" else "❌"
+            summary_lines.append(f"   {icon} {entry['user']} - {entry['instructor']} at {entry['time']}: {outcome}")
+        print("\n".join(summary_lines))
         return True
@@ -63,8 +63,11 @@ def test_email_notification():
     
     print("\n📤 Attempting to send test notification email...")
     
-    # Test the email notification
-    bot._send_booking_failure_email(test_booking_details, failure_reason, error_details)
+    # Test the email notification; the bot keeps its SMTP connection open for reuse, so close it here
+    try:
+        bot._send_booking_failure_email(test_booking_details, failure_reason, error_details)
+    finally:
+        GymBookingBot.close_smtp()
     
     print("\n✅ Test completed!")
     
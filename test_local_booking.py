@@ -5,10 +5,15 @@ Run this locally to test booking functionality without deploying to Render
 """
 
 import asyncio
-from datetime import datetime, timedelta
+import functools
+import re
+import signal
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from types import MappingProxyType
 from typing import Optional
 from gym_booking_bot import GymBookingBot
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, Browser
 import os
 
 DAY_NAME_TO_INDEX = {
@@ -30,10 +35,28 @@ def _normalize_day(day_name: str) -> str:
         raise ValueError(f"Invalid day '{day_name}'. Expected one of {', '.join(DAY_NAME_TO_INDEX.keys())}.")
     return day
 
-def _compute_target_date_from_offset(days_ahead: int) -> datetime:
+def _at_midnight(day: date) -> datetime:
+    """Midnight on `day`, as the booking methods expect a datetime."""
+    return datetime.combine(day, datetime.min.time())
+
+# Only the plain YYYY-MM-DD form; fromisoformat alone would also take 20251024 or 2025-W43-5
+_YMD_RE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+
+@functools.lru_cache(maxsize=32)
+def _parse_ymd(date_str: str) -> datetime:
+    """Parse a YYYY-MM-DD date to midnight with the C-level ISO parser; raises ValueError if malformed."""
+    if not _YMD_RE.fullmatch(date_str):
+        raise ValueError(f"Invalid date '{date_str}', expected YYYY-MM-DD")
+    return _at_midnight(date.fromisoformat(date_str))
+
+@functools.lru_cache(maxsize=32)
+def _offset_date(today_ordinal: int, days_ahead: int) -> date:
+    """The day `days_ahead` days after the given day; keyed on the day so results roll over at midnight."""
+    return date.fromordinal(today_ordinal + days_ahead)
+
+def _compute_target_date_from_offset(days_ahead: int) -> date:
     """Return the date that is exactly `days_ahead` days from today."""
-    base_date = datetime.now().date() + timedelta(days=days_ahead)
-    return datetime.combine(base_date, datetime.min.time())
+    return _offset_date(date.today().toordinal(), days_ahead)
 
 def _compute_next_occurrence_of_day(day_name: str) -> datetime:
     """Return the next calendar date matching the provided day-of-week."""
@@ -44,55 +67,153 @@ def _compute_next_occurrence_of_day(day_name: str) -> datetime:
     base_date = today + timedelta(days=delta_days)
     return datetime.combine(base_date, datetime.min.time())
 
+# Environment the tests can't run without
+REQUIRED_ENV = ("PETER_USERNAME", "PETER_PASSWORD", "GYM_URL")
+
+def _validate_env() -> bool:
+    """Check the required environment in one pass, reporting everything that's missing."""
+    missing = [name for name in REQUIRED_ENV if not os.environ.get(name)]
+    if missing:
+        print(f"❌ Missing {', '.join(missing)} in .env file")
+        return False
+    return True
+
 def _parse_env_int(name: str, default: int) -> int:
     """Parse an integer from environment variables with a fallback."""
-    try:
-        return int(os.getenv(name, default))
-    except (TypeError, ValueError):
+    raw = os.environ.get(name)
+    if raw is None:
         return default
+    # Validate up front rather than raising and catching on malformed values
+    raw = raw.strip()
+    # One optional sign, then decimal digits (any script int() accepts)
+    digits = raw[1:] if raw[:1] in ('+', '-') else raw
+    if digits.isdecimal():
+        return int(raw)
+    return default
+
+def _optional_env_int(name: str) -> Optional[int]:
+    """Parse an optional integer setting; unset or blank means None, malformed means 0."""
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return None
+    return _parse_env_int(name, 0)
+
+# Test defaults, read from the environment once at import; read-only from here on
+_CFG = MappingProxyType({
+    'swim_user': os.getenv('TEST_SWIM_USER') or "peter",
+    'swim_day': os.getenv('TEST_SWIM_DAY') or "tuesday",
+    'swim_time': os.getenv('TEST_SWIM_TIME') or "16:00",
+    'swim_duration': _parse_env_int('TEST_SWIM_DURATION', 30),
+    'swim_days_ahead': _parse_env_int('TEST_SWIM_DAYS_AHEAD', 8),
+    'class_user': os.getenv('TEST_CLASS_USER') or "peter",
+    'class_day': os.getenv('TEST_CLASS_DAY') or "saturday",
+    'class_time': os.getenv('TEST_CLASS_TIME') or "08:15",
+    'class_instructor': os.getenv('TEST_CLASS_INSTRUCTOR') or "Mari",
+    'class_days_ahead': _optional_env_int('TEST_CLASS_DAYS_AHEAD'),
+    # The menu preview has always fallen back to 3 days when the setting is unset or malformed
+    'class_preview_days_ahead': _parse_env_int('TEST_CLASS_DAYS_AHEAD', 3),
+})
+
+# Saved sessions per user and test, so repeat local runs can skip the login form
+_SESSION_DIR = os.path.expanduser('~/.cache/gym-booking-bot')
+
+class LoginError(Exception):
+    """Raised when a test can't log in to the gym site."""
+
+class BookingError(Exception):
+    """Raised when a test's parameters are invalid or its booking doesn't go through."""
+
+def _session_state_path(user_name: str, session_name: str) -> str:
+    """Where the saved cookies/storage for `user_name`'s `session_name` test live."""
+    return os.path.join(_SESSION_DIR, f"{user_name.lower()}-{session_name}-state.json")
+
+def _create_private_file(path: str) -> None:
+    """Create `path` readable only by this user, before anything sensitive is written to it."""
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    os.close(os.open(path, os.O_WRONLY | os.O_CREAT, 0o600))
+
+@asynccontextmanager
+async def _logged_in_page(browser: Browser, user_name: str, session_name: str):
+    """Yield (bot, page) logged in as `user_name` in a fresh context, closing it afterwards."""
+    bot = GymBookingBot(user_name=user_name, browser=browser)
+    
+    # Each test gets its own context and its own saved session, so tests running at once
+    # on the shared browser never share a login or write the same state file
+    state_path = _session_state_path(user_name, session_name)
+    has_saved_session = os.path.exists(state_path)
+    context = await bot.new_context(storage_state=state_path if has_saved_session else None)
+    try:
+        page = await context.new_page()
+        
+        # Only a restored session can already be logged in; a cold context goes straight to login
+        if has_saved_session and await bot.is_logged_in(page):
+            print("✅ Reusing saved session, skipping login")
+        else:
+            # Login
+            print("🔑 Attempting login...")
+            if not await bot.login(page):
+                raise LoginError(f"Login failed for {user_name}")
+            
+            print("✅ Login successful!")
+            # Session cookies are credentials; the file is private before they are written
+            _create_private_file(state_path)
+            await context.storage_state(path=state_path)
+        yield bot, page
+    finally:
+        await context.close()
+
+def _prompt(message: str) -> str:
+    """Read a line with input(), letting Ctrl-C interrupt it even under asyncio.run."""
+    # asyncio.run's own SIGINT handler only cancels the main task, which can't happen
+    # while input() blocks the loop; use the default handler so the read raises
+    previous = signal.signal(signal.SIGINT, signal.default_int_handler)
+    try:
+        return input(message)
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+async def _launch_browser(playwright) -> Browser:
+    """Launch the one visible browser shared by every test in this run."""
+    # Use the same browser detection logic as the main bot
+    is_local, browser_path = GymBookingBot._detect_browser_environment()
+    if is_local and browser_path:
+        return await playwright.chromium.launch(
+            headless=False,  # Always show browser for testing
+            executable_path=browser_path
+        )
+    return await playwright.chromium.launch(headless=False)
 
 async def test_swim_booking(
+    browser: Browser,
     user: Optional[str] = None,
     day_name: Optional[str] = None,
     time_str: Optional[str] = None,
     duration: Optional[int] = None,
     target_date_override: Optional[str] = None,
     days_ahead: Optional[int] = None,
-) -> bool:
-    """Test swim booking functionality locally"""
+) -> None:
+    """Test swim booking functionality locally; raises LoginError or BookingError on failure"""
     print("🧪 Testing swim booking locally...")
     
-    # Check for required environment variables
-    if not os.getenv('PETER_USERNAME') or not os.getenv('PETER_PASSWORD'):
-        print("❌ Missing credentials in .env file")
-        print("   Please set PETER_USERNAME and PETER_PASSWORD")
-        return False
-    
-    if not os.getenv('GYM_URL'):
-        print("❌ Missing GYM_URL in .env file")
-        return False
-    
-    user = (user or os.getenv('TEST_SWIM_USER') or "peter").lower()
-    day_name = day_name or os.getenv('TEST_SWIM_DAY') or "tuesday"
-    time_str = time_str or os.getenv('TEST_SWIM_TIME') or "16:00"
-    duration = duration or _parse_env_int('TEST_SWIM_DURATION', 30)
-    days_ahead_value = days_ahead if days_ahead is not None else _parse_env_int('TEST_SWIM_DAYS_AHEAD', 8)
+    user = (user or _CFG['swim_user']).lower()
+    day_name = day_name or _CFG['swim_day']
+    time_str = time_str or _CFG['swim_time']
+    duration = duration or _CFG['swim_duration']
+    days_ahead_value = days_ahead if days_ahead is not None else _CFG['swim_days_ahead']
 
     if target_date_override:
         try:
-            target_date = datetime.strptime(target_date_override, "%Y-%m-%d")
+            target_date = _parse_ymd(target_date_override)
         except ValueError:
-            print(f"❌ Invalid target date override '{target_date_override}'. Expected YYYY-MM-DD.")
-            return False
+            raise BookingError(f"Invalid target date override '{target_date_override}'. Expected YYYY-MM-DD.") from None
     else:
-        target_date = _compute_target_date_from_offset(days_ahead_value)
+        target_date = _at_midnight(_compute_target_date_from_offset(days_ahead_value))
 
     # Warn if the computed day does not line up with the schedule day
     try:
         normalized_day = _normalize_day(day_name)
     except ValueError as exc:
-        print(f"❌ {exc}")
-        return False
+        raise BookingError(str(exc)) from exc
 
     actual_day = target_date.strftime('%A').lower()
     days_out = (target_date.date() - datetime.now().date()).days
@@ -113,104 +234,45 @@ async def test_swim_booking(
     print(f"⏱️  Duration: {test_duration} minutes")
     print(f"🕐 Time: {test_time}")
     
-    # Create bot instance
-    # Set headless=False via environment variable for testing
-    os.environ['HEADLESS'] = 'false'
-    bot = GymBookingBot(user_name=test_user)
+    async with _logged_in_page(browser, test_user, "swim") as (bot, page):
+        # Test swim booking
+        print(f"🏊 Testing swim booking for {target_date.strftime('%Y-%m-%d')} at {test_time}...")
+        if not await bot.book_swim_lane(page, target_date, test_duration, test_time):
+            raise BookingError(f"Swim booking test FAILED: {test_duration}min at {test_time}")
     
-    async with async_playwright() as p:
-        # Use the same browser detection logic as the main bot
-        import platform
-        
-        # Use bot's browser detection method
-        temp_bot = GymBookingBot(user_name=test_user)
-        is_local, browser_path = temp_bot._detect_browser_environment()
-        
-        if is_local and browser_path:
-            browser = await p.chromium.launch(
-                headless=False,  # Always show browser for testing
-                executable_path=browser_path
-            )
-        else:
-            browser = await p.chromium.launch(headless=False)
-        
-        context = await browser.new_context()
-        page = await context.new_page()
-        
-        try:
-            # Login
-            print("🔑 Attempting login...")
-            if not await bot.login(page):
-                print("❌ Login failed")
-                return False
-            
-            print("✅ Login successful!")
-            
-            # Test swim booking
-            print(f"🏊 Testing swim booking for {target_date.strftime('%Y-%m-%d')} at {test_time}...")
-            success = await bot.book_swim_lane(page, target_date, test_duration, test_time)
-            
-            if success:
-                print(f"🎉 Swim booking test SUCCESSFUL: {test_duration}min at {test_time}")
-                return True
-            else:
-                print(f"❌ Swim booking test FAILED: {test_duration}min at {test_time}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Test error: {e}")
-            return False
-        finally:
-            await browser.close()
+    print(f"🎉 Swim booking test SUCCESSFUL: {test_duration}min at {test_time}")
 
 async def test_class_booking(
+    browser: Browser,
     user: Optional[str] = None,
     day_name: Optional[str] = None,
     time_str: Optional[str] = None,
     instructor: Optional[str] = None,
     target_date_override: Optional[str] = None,
     days_ahead: Optional[int] = None,
-) -> bool:
-    """Test class booking functionality locally"""
+) -> None:
+    """Test class booking functionality locally; raises LoginError or BookingError on failure"""
     print("🧪 Testing class booking locally...")
     
-    # Check for required environment variables
-    if not os.getenv('PETER_USERNAME') or not os.getenv('PETER_PASSWORD'):
-        print("❌ Missing credentials in .env file")
-        print("   Please set PETER_USERNAME and PETER_PASSWORD")
-        return False
-    
-    if not os.getenv('GYM_URL'):
-        print("❌ Missing GYM_URL in .env file")
-        return False
-    
-    user = (user or os.getenv('TEST_CLASS_USER') or "peter").lower()
-    day_name = day_name or os.getenv('TEST_CLASS_DAY') or "saturday"
-    time_str = time_str or os.getenv('TEST_CLASS_TIME') or "08:15"
-    instructor = instructor or os.getenv('TEST_CLASS_INSTRUCTOR') or "Mari"
+    user = (user or _CFG['class_user']).lower()
+    day_name = day_name or _CFG['class_day']
+    time_str = time_str or _CFG['class_time']
+    instructor = instructor or _CFG['class_instructor']
     
     try:
         normalized_day = _normalize_day(day_name)
     except ValueError as exc:
-        print(f"❌ {exc}")
-        return False
+        raise BookingError(str(exc)) from exc
 
-    env_days_ahead_raw = os.getenv('TEST_CLASS_DAYS_AHEAD')
-    if days_ahead is not None:
-        days_ahead_value = days_ahead
-    elif env_days_ahead_raw is not None and env_days_ahead_raw.strip() != "":
-        days_ahead_value = _parse_env_int('TEST_CLASS_DAYS_AHEAD', 0)
-    else:
-        days_ahead_value = None
+    days_ahead_value = days_ahead if days_ahead is not None else _CFG['class_days_ahead']
 
     if target_date_override:
         try:
-            target_date = datetime.strptime(target_date_override, "%Y-%m-%d")
+            target_date = _parse_ymd(target_date_override)
         except ValueError:
-            print(f"❌ Invalid target date override '{target_date_override}'. Expected YYYY-MM-DD.")
-            return False
+            raise BookingError(f"Invalid target date override '{target_date_override}'. Expected YYYY-MM-DD.") from None
     elif days_ahead_value is not None:
-        target_date = _compute_target_date_from_offset(days_ahead_value)
+        target_date = _at_midnight(_compute_target_date_from_offset(days_ahead_value))
     else:
         target_date = _compute_next_occurrence_of_day(normalized_day)
 
@@ -234,107 +296,36 @@ async def test_class_booking(
     print(f"👨‍🏫 Instructor: {test_instructor}")
     print(f"🕐 Time: {test_time}")
     
-    # Create bot instance
-    # Set headless=False via environment variable for testing
-    os.environ['HEADLESS'] = 'false'
-    bot = GymBookingBot(user_name=test_user)
+    async with _logged_in_page(browser, test_user, "class") as (bot, page):
+        # Test class booking
+        print(f"💪 Testing class booking for {target_date.strftime('%Y-%m-%d')} at {test_time}...")
+        if not await bot.book_class(page, target_date, test_instructor, test_time):
+            raise BookingError(f"Class booking test FAILED: {test_instructor} at {test_time}")
     
-    async with async_playwright() as p:
-        # Use the same browser detection logic
-        import platform
-        
-        is_local = (
-            os.getenv('RENDER') is None and
-            platform.system() == 'Darwin'
-        )
-        
-        if is_local:
-            print("🏠 Running locally - using local Chromium installation")
-            local_chromium_paths = [
-                '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
-                '/usr/local/bin/chromium',
-                '/opt/homebrew/bin/chromium',
-                '/Applications/Chromium.app/Contents/MacOS/Chromium'
-            ]
-            
-            browser_path = None
-            for path in local_chromium_paths:
-                if os.path.exists(path):
-                    browser_path = path
-                    print(f"✅ Found browser at: {browser_path}")
-                    break
-            
-            if browser_path:
-                browser = await p.chromium.launch(
-                    headless=False,
-                    executable_path=browser_path
-                )
-            else:
-                print("⚠️  No local browser found, trying default Playwright installation")
-                browser = await p.chromium.launch(headless=False)
-        else:
-            browser = await p.chromium.launch(headless=False)
-        
-        context = await browser.new_context()
-        page = await context.new_page()
-        
-        try:
-            # Login
-            print("🔑 Attempting login...")
-            if not await bot.login(page):
-                print("❌ Login failed")
-                return False
-            
-            print("✅ Login successful!")
-            
-            # Test class booking
-            print(f"💪 Testing class booking for {target_date.strftime('%Y-%m-%d')} at {test_time}...")
-            success = await bot.book_class(page, target_date, test_instructor, test_time)
-            
-            if success:
-                print(f"🎉 Class booking test SUCCESSFUL: {test_instructor} at {test_time}")
-                return True
-            else:
-                print(f"❌ Class booking test FAILED: {test_instructor} at {test_time}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Test error: {e}")
-            return False
-        finally:
-            await browser.close()
+    print(f"🎉 Class booking test SUCCESSFUL: {test_instructor} at {test_time}")
 
-async def test_custom_swim_booking():
-    """Test swim booking with custom parameters"""
+async def test_custom_swim_booking(browser: Browser) -> None:
+    """Test swim booking with custom parameters; raises LoginError or BookingError on failure"""
     print("🧪 Custom swim booking test...")
     
-    # Check for required environment variables
-    if not os.getenv('PETER_USERNAME') or not os.getenv('PETER_PASSWORD'):
-        print("❌ Missing credentials in .env file")
-        return False
-    
-    if not os.getenv('GYM_URL'):
-        print("❌ Missing GYM_URL in .env file")
-        return False
-    
     # Get custom parameters
-    default_day = os.getenv('TEST_SWIM_DAY') or "tuesday"
-    default_time = os.getenv('TEST_SWIM_TIME') or "16:00"
-    default_duration = _parse_env_int('TEST_SWIM_DURATION', 30)
-    default_days_ahead = _parse_env_int('TEST_SWIM_DAYS_AHEAD', 8)
+    default_day = _CFG['swim_day']
+    default_time = _CFG['swim_time']
+    default_duration = _CFG['swim_duration']
+    default_days_ahead = _CFG['swim_days_ahead']
 
     suggested_date = _compute_target_date_from_offset(default_days_ahead)
 
     print("Enter test parameters (leave blank to use defaults):")
-    date_str = input(f"Date (YYYY-MM-DD) [{suggested_date.strftime('%Y-%m-%d')}]: ").strip()
-    time_str = input(f"Time (HH:MM) [{default_time}]: ").strip()
-    duration_str = input(f"Duration (15 or 30) [{default_duration}]: ").strip()
+    date_str = _prompt(f"Date (YYYY-MM-DD) [{suggested_date.strftime('%Y-%m-%d')}]: ").strip()
+    time_str = _prompt(f"Time (HH:MM) [{default_time}]: ").strip()
+    duration_str = _prompt(f"Duration (15 or 30) [{default_duration}]: ").strip()
 
     try:
         if date_str:
-            target_date = datetime.strptime(date_str, '%Y-%m-%d')
+            target_date = _parse_ymd(date_str)
         else:
-            target_date = suggested_date
+            target_date = _at_midnight(suggested_date)
 
         test_duration = int(duration_str) if duration_str else default_duration
         if test_duration not in [15, 30]:
@@ -342,143 +333,128 @@ async def test_custom_swim_booking():
 
         time_str = time_str or default_time
     except ValueError as e:
-        print(f"❌ Invalid input: {e}")
-        return False
+        raise BookingError(f"Invalid input: {e}") from e
     
     print(f"📅 Target date: {target_date.strftime('%Y-%m-%d (%A)')}")
     print(f"⏱️  Duration: {test_duration} minutes")
     print(f"🕐 Time: {time_str}")
     
-    # Set headless=False via environment variable for testing
-    os.environ['HEADLESS'] = 'false'
-    bot = GymBookingBot(user_name="peter")
+    async with _logged_in_page(browser, "peter", "custom-swim") as (bot, page):
+        # Test swim booking
+        print(f"🏊 Testing custom swim booking for {target_date.strftime('%Y-%m-%d')} at {time_str}...")
+        if not await bot.book_swim_lane(page, target_date, test_duration, time_str):
+            raise BookingError(f"Custom swim booking test FAILED: {test_duration}min at {time_str}")
     
-    async with async_playwright() as p:
-        # Use the same browser detection logic as the main bot
-        import platform
-        
-        is_local = (
-            os.getenv('RENDER') is None and
-            platform.system() == 'Darwin'
-        )
-        
-        if is_local:
-            print("🏠 Running locally - using local Chromium installation")
-            local_chromium_paths = [
-                '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
-                '/usr/local/bin/chromium',
-                '/opt/homebrew/bin/chromium',
-                '/Applications/Chromium.app/Contents/MacOS/Chromium'
-            ]
-            
-            browser_path = None
-            for path in local_chromium_paths:
-                if os.path.exists(path):
-                    browser_path = path
-                    print(f"✅ Found browser at: {browser_path}")
-                    break
-            
-            if browser_path:
-                browser = await p.chromium.launch(
-                    headless=False,
-                    executable_path=browser_path
-                )
-            else:
-                print("⚠️  No local browser found, trying default Playwright installation")
-                browser = await p.chromium.launch(headless=False)
-        else:
-            browser = await p.chromium.launch(headless=False)
-        
-        context = await browser.new_context()
-        page = await context.new_page()
-        
-        try:
-            # Login
-            print("🔑 Attempting login...")
-            if not await bot.login(page):
-                print("❌ Login failed")
-                return False
-            
-            print("✅ Login successful!")
-            
-            # Test swim booking
-            print(f"🏊 Testing custom swim booking for {target_date.strftime('%Y-%m-%d')} at {time_str}...")
-            success = await bot.book_swim_lane(page, target_date, test_duration, time_str)
-            
-            if success:
-                print(f"🎉 Custom swim booking test SUCCESSFUL: {test_duration}min at {time_str}")
-                return True
-            else:
-                print(f"❌ Custom swim booking test FAILED: {test_duration}min at {time_str}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Test error: {e}")
-            return False
-        finally:
-            await browser.close()
-
-async def main():
-    """Main test function"""
-    print("🧪 Local Gym Booking Bot Test")
-    print("=" * 40)
+    print(f"🎉 Custom swim booking test SUCCESSFUL: {test_duration}min at {time_str}")
 
-    swim_day = os.getenv('TEST_SWIM_DAY') or "tuesday"
-    swim_time = os.getenv('TEST_SWIM_TIME') or "16:00"
-    swim_duration = _parse_env_int('TEST_SWIM_DURATION', 30)
-    swim_days_ahead = _parse_env_int('TEST_SWIM_DAYS_AHEAD', 8)
+def _swim_preview() -> str:
+    """Describe the default swim test for the menu, computed only when the menu shows it."""
+    swim_day = _CFG['swim_day']
+    swim_time = _CFG['swim_time']
+    swim_duration = _CFG['swim_duration']
+    swim_days_ahead = _CFG['swim_days_ahead']
 
     try:
         normalized_swim_day = _normalize_day(swim_day)
     except ValueError as exc:
-        swim_preview = f"⚠️  {exc}"
-    else:
-        swim_preview_date = _compute_target_date_from_offset(swim_days_ahead)
-        actual_day = swim_preview_date.strftime('%A').lower()
-        warning = ""
-        if actual_day != normalized_swim_day:
-            warning = f" ⚠️ (falls on {actual_day.title()})"
-        swim_preview = f"{swim_preview_date.strftime('%Y-%m-%d (%A)')} at {swim_time} ({swim_duration}min){warning}"
-
-    class_day = os.getenv('TEST_CLASS_DAY') or "saturday"
-    class_time = os.getenv('TEST_CLASS_TIME') or "08:15"
-    class_instructor = os.getenv('TEST_CLASS_INSTRUCTOR') or "Mari"
-    class_days_ahead = _parse_env_int('TEST_CLASS_DAYS_AHEAD', 3)
+        return f"⚠️  {exc}"
+    swim_preview_date = _compute_target_date_from_offset(swim_days_ahead)
+    actual_day = swim_preview_date.strftime('%A').lower()
+    warning = ""
+    if actual_day != normalized_swim_day:
+        warning = f" ⚠️ (falls on {actual_day.title()})"
+    return f"{swim_preview_date.strftime('%Y-%m-%d (%A)')} at {swim_time} ({swim_duration}min){warning}"
+
+def _class_preview() -> str:
+    """Describe the default class test for the menu, computed only when the menu shows it."""
+    class_day = _CFG['class_day']
+    class_time = _CFG['class_time']
+    class_instructor = _CFG['class_instructor']
+    class_days_ahead = _CFG['class_preview_days_ahead']
 
     try:
         normalized_class_day = _normalize_day(class_day)
     except ValueError as exc:
-        class_preview = f"⚠️  {exc}"
-    else:
-        class_preview_date = _compute_target_date_from_offset(class_days_ahead)
-        actual_day = class_preview_date.strftime('%A').lower()
-        warning = ""
-        if actual_day != normalized_class_day:
-            warning = f" ⚠️ (falls on {actual_day.title()})"
-        class_preview = f"{class_preview_date.strftime('%Y-%m-%d (%A)')} at {class_time} with {class_instructor}{warning}"
-    
-    # Test what you need
-    print("Choose test type:")
-    print(f"1. Swim booking ({swim_preview})")
-    print(f"2. Class booking ({class_preview})")
-    print("3. Both")
-    print("4. Custom swim test")
-    
-    choice = input("Enter choice (1-4): ").strip()
-    
-    if choice == "1":
-        await test_swim_booking()
-    elif choice == "2":
-        await test_class_booking()
-    elif choice == "3":
-        print("\n🏊 Testing swim booking first...")
-        await test_swim_booking()
-        print("\n💪 Testing class booking next...")
-        await test_class_booking()
-    elif choice == "4":
-        await test_custom_swim_booking()
+        return f"⚠️  {exc}"
+    class_preview_date = _compute_target_date_from_offset(class_days_ahead)
+    actual_day = class_preview_date.strftime('%A').lower()
+    warning = ""
+    if actual_day != normalized_class_day:
+        warning = f" ⚠️ (falls on {actual_day.title()})"
+    return f"{class_preview_date.strftime('%Y-%m-%d (%A)')} at {class_time} with {class_instructor}{warning}"
+
+def _report_outcome(label: str, outcome) -> None:
+    """Print how a test ended: None if it passed, otherwise the exception it raised."""
+    if outcome is None:
+        print(f"✅ {label} test passed")
+    elif isinstance(outcome, (LoginError, BookingError)):
+        print(f"❌ {label} test failed: {outcome}")
     else:
-        print("❌ Invalid choice")
+        print(f"❌ {label} test error: {outcome}")
+
+async def main():
+    """Main test function"""
+    print("🧪 Local Gym Booking Bot Test")
+    print("=" * 40)
+
+    # Fail before prompting or launching anything if the environment isn't set up
+    if not _validate_env():
+        return
+
+    # Set headless=False via environment variable for testing
+    os.environ['HEADLESS'] = 'false'
+
+    async with async_playwright() as p:
+        # Start Chromium now so it warms up while the user reads the menu and types
+        launch_task = asyncio.create_task(_launch_browser(p))
+        # One loop step hands the launch request to the Playwright driver, which starts
+        # Chromium on its own while the prompt below blocks
+        await asyncio.sleep(0)
+        try:
+            # Test what you need
+            print("Choose test type:")
+            print(f"1. Swim booking ({_swim_preview()})")
+            print(f"2. Class booking ({_class_preview()})")
+            print("3. Both")
+            print("4. Custom swim test")
+            
+            # Read synchronously; an executor thread stuck in input() would hang Ctrl-C at shutdown
+            choice = _prompt("Enter choice (1-4): ").strip()
+            
+            tests = {
+                "1": [("Swim", test_swim_booking)],
+                "2": [("Class", test_class_booking)],
+                "3": [("Swim", test_swim_booking), ("Class", test_class_booking)],
+                "4": [("Custom swim", test_custom_swim_booking)],
+            }.get(choice)
+            if tests is None:
+                print("❌ Invalid choice")
+                # Nothing will use the browser; stop launching it
+                launch_task.cancel()
+                return
+            
+            # One browser for the run; each test opens its own context on it
+            browser = await launch_task
+            if len(tests) > 1:
+                print("\n🏊💪 Testing swim and class booking together...")
+            # Independent contexts, so tests can run at once; one failing doesn't hide another
+            results = await asyncio.gather(*(test(browser) for _, test in tests), return_exceptions=True)
+            for (label, _), outcome in zip(tests, results):
+                _report_outcome(label, outcome)
+        finally:
+            if not launch_task.done():
+                launch_task.cancel()
+            # Close only a browser that actually launched; a failed launch already raised above
+            elif not launch_task.cancelled() and launch_task.exception() is None:
+                await launch_task.result().close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop trims event-loop overhead on the Playwright round-trips; optional and not on Windows
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())